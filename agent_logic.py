@@ -10,40 +10,97 @@ import textwrap
 import os
 import re
 import json
-from typing import Dict, List, Optional, Tuple, Any
-from datetime import datetime
-from groq import Groq
-from dotenv import load_dotenv
+import asyncio
+from dataclasses import dataclass
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from itertools import chain
+from types import MappingProxyType
+from typing import Callable, Dict, Iterator, List, Mapping, Optional, Tuple, Any
+from datetime import date, datetime
+import httpx
+from groq import Groq, AsyncGroq
 
 from state import (
-    ConversationPhase, UserPersona, update_state, add_message,
+    ConversationPhase, UserPersona, PendingClarification, update_state, add_message,
     get_recent_context, update_persona_signals, set_phase,
-    set_plan_section, has_complete_plan
+    set_plan_section, has_complete_plan, section_key_for, REQUIRED_PLAN_SECTIONS
 )
-from research_tools import fetch_company_data, format_research_for_prompt, normalize_research_data
+from llm_batch import run_chat_batch
+from research_cache import cached_fetch_company_data, canonicalize
+from research_tools import ResearchResult, format_research_for_prompt, normalize_research_data
 from utils import (
     clean_text, is_update_request, detect_intent,
-    detect_confusion_signals, detect_efficiency_signals, format_account_plan,
-    validate_company_name, is_confirmation_response, is_numeric_selection,
-    CONFIRMATION_WORDS, GREETING_WORDS, FAREWELL_WORDS
+    detect_confusion_signals, detect_user_signals, strip_filler_prefix, format_account_plan,
+    validate_company_name, is_confirmation_response, is_numeric_selection, json_loads,
+    NAME_STOP_WORDS
 )
 from company_normalizer import (
-    extract_company_with_llm, needs_confirmation, format_confirmation_message,
-    resolve_contextual_reference, fuzzy_match_company, NON_COMPANY_WORDS
+    cached_extract_company_with_llm, needs_confirmation, format_confirmation_message,
+    resolve_contextual_reference, fuzzy_match_company, NON_COMPANY_WORDS,
+    clean_input, match_known_company, match_company_alias
 )
-def wrap_text(text: str, width: 100) -> str:
+def wrap_text(text: str, width: int = 100) -> str:
     return textwrap.fill(text, width=width)
 
-load_dotenv()
 
-client = Groq(api_key=os.getenv("GROQ_API_KEY"))
-MODEL = "llama-3.1-8b-instant"
+
+@dataclass(frozen=True, slots=True)
+class _Config:
+    """LLM settings resolved once at import."""
+    api_key: Optional[str]
+    model: str = "llama-3.1-8b-instant"
+    # Output budgets sized per call type; small caps let short turns finish sooner
+    max_tokens: int = 512
+    plan_max_tokens: int = 2000
+    section_max_tokens: int = 300
+    chat_max_tokens: int = 400
+    debug: bool = False
+
+
+CFG = _Config(
+    api_key=os.environ.get("GROQ_API_KEY"),
+    debug=os.getenv("DEBUG", "false").lower() == "true"
+)
+
+# Keep-alive pool shared by every LLM call; HTTP/2 only when the h2 extra is installed
+try:
+    import h2  # noqa: F401
+    HTTP2_ENABLED = True
+except ImportError:
+    HTTP2_ENABLED = False
+
+HTTP_LIMITS = httpx.Limits(max_keepalive_connections=64, max_connections=128)
+HTTP_TIMEOUT = httpx.Timeout(60.0, connect=5.0)
+
+client = Groq(
+    api_key=CFG.api_key,
+    http_client=httpx.Client(http2=HTTP2_ENABLED, limits=HTTP_LIMITS, timeout=HTTP_TIMEOUT)
+)
+aclient = AsyncGroq(
+    api_key=CFG.api_key,
+    http_client=httpx.AsyncClient(http2=HTTP2_ENABLED, limits=HTTP_LIMITS, timeout=HTTP_TIMEOUT)
+)
+
+
+# Enum values used on every turn, resolved once instead of per attribute lookup
+_PERSONA_UNKNOWN = UserPersona.UNKNOWN.value
+_PERSONA_CONFUSED = UserPersona.CONFUSED.value
+_PERSONA_EFFICIENT = UserPersona.EFFICIENT.value
+_PERSONA_CHATTY = UserPersona.CHATTY.value
+_PERSONA_EDGE_CASE = UserPersona.EDGE_CASE.value
+_PHASE_CLARIFYING = ConversationPhase.CLARIFYING.value
+_PHASE_GATHERING = ConversationPhase.GATHERING_COMPANY.value
+_PHASE_PLAN_READY = ConversationPhase.PLAN_READY.value
 
 
 # ============================================
 # SYSTEM PROMPTS
 # ============================================
 
+# NOTE: AGENT_SYSTEM_PROMPT must stay byte-identical across turns so Groq can serve it
+# from the prompt cache. Anything per-turn (date, phase, persona) goes in a separate
+# system message built by _build_contextual_messages.
 AGENT_SYSTEM_PROMPT = """You are a professional Company Research Assistant. Your role is to help users research companies and create structured Account Plans.
 
 Your personality traits:
@@ -67,8 +124,6 @@ Behavioral guidelines:
 - Always report progress during research.
 - Ask for clarification if company name is ambiguous.
 - If a message is classified as 'unclear' or 'off_topic', do NOT try to interpret it as a company name.
-
-Current date: {current_date}
 """
 
 PLAN_GENERATION_PROMPT = """Based on the following company research data, generate a comprehensive Account Plan.
@@ -103,60 +158,80 @@ Format your response as valid JSON with exactly these keys:
 
 Respond ONLY with the JSON object, no additional text."""
 
+SECTION_GENERATION_PROMPT = """Based on the following company research data, write the {section_title} section of an Account Plan.
+
+RESEARCH DATA:
+{research_data}
+
+Respond with 2-4 sentences of plain text only. Do not include JSON, headings, or the section name."""
+
 
 # ============================================
 # PERSONA ADAPTATION
 # ============================================
 
-def get_persona_style(persona: str) -> Dict[str, str]:
+_FILLERS = ("Sure!", "Of course!", "Absolutely!", "Great question!", "Hello!", "Hi there!", "I'd be happy to", "Let me")
+_QUESTION_END_RE = re.compile(r'[\?!\n]$')
+
+
+# Built once at import; read-only so callers cannot mutate the shared styles
+_PERSONA_STYLES = MappingProxyType({
+    _PERSONA_CONFUSED: MappingProxyType({
+        "tone": "patient and supportive",
+        "detail_level": "high with examples",
+        "pacing": "step-by-step",
+        "extra_guidance": True
+    }),
+    _PERSONA_EFFICIENT: MappingProxyType({
+        "tone": "concise and direct",
+        "detail_level": "minimal, facts only",
+        "pacing": "fast",
+        "extra_guidance": False
+    }),
+    _PERSONA_CHATTY: MappingProxyType({
+        "tone": "friendly but focused",
+        "detail_level": "moderate",
+        "pacing": "moderate with gentle redirects",
+        "extra_guidance": False
+    }),
+    _PERSONA_UNKNOWN: MappingProxyType({
+        "tone": "professional and helpful",
+        "detail_level": "moderate",
+        "pacing": "normal",
+        "extra_guidance": True
+    }),
+    _PERSONA_EDGE_CASE: MappingProxyType({
+        "tone": "helpful and clarifying",
+        "detail_level": "moderate with validation",
+        "pacing": "careful",
+        "extra_guidance": True
+    })
+})
+
+
+def get_persona_style(persona: str) -> Mapping[str, Any]:
     """Get communication style based on detected persona."""
-    styles = {
-        UserPersona.CONFUSED.value: {
-            "tone": "patient and supportive",
-            "detail_level": "high with examples",
-            "pacing": "step-by-step",
-            "extra_guidance": True
-        },
-        UserPersona.EFFICIENT.value: {
-            "tone": "concise and direct",
-            "detail_level": "minimal, facts only",
-            "pacing": "fast",
-            "extra_guidance": False
-        },
-        UserPersona.CHATTY.value: {
-            "tone": "friendly but focused",
-            "detail_level": "moderate",
-            "pacing": "moderate with gentle redirects",
-            "extra_guidance": False
-        },
-        UserPersona.UNKNOWN.value: {
-            "tone": "professional and helpful",
-            "detail_level": "moderate",
-            "pacing": "normal",
-            "extra_guidance": True
-        },
-        UserPersona.EDGE_CASE.value: {
-            "tone": "helpful and clarifying",
-            "detail_level": "moderate with validation",
-            "pacing": "careful",
-            "extra_guidance": True
-        }
-    }
-    return styles.get(persona, styles[UserPersona.UNKNOWN.value])
+    return _PERSONA_STYLES.get(persona, _PERSONA_STYLES[_PERSONA_UNKNOWN])
 
 
 def adapt_response(response: str, persona: str, state: Dict) -> str:
     """Adapt response based on user persona."""
     
-    if persona == UserPersona.EFFICIENT.value:
+    if persona == _PERSONA_EFFICIENT:
         # Trim filler words aggressively
-        response = re.sub(r'^(Sure!|Of course!|Absolutely!|Great question!|Hello!|Hi there!|I\'d be happy to|Let me)[\s\.,]*', '', response).strip()
+        response = response.strip()
+        # Cheap C-level prefix test first; most responses carry no filler
+        if response.startswith(_FILLERS):
+            for filler in _FILLERS:
+                if response.startswith(filler):
+                    response = response[len(filler):].lstrip(" \t\r\n.,")
+                    break
         response = response[0].upper() + response[1:] if response else ""
         
     
-    if persona == UserPersona.CONFUSED.value:
+    if persona == _PERSONA_CONFUSED:
         # Add supportive closing line if the response isn't a question or an error message
-        if not re.search(r'[\?!\n]$', response.strip()) and not response.lower().startswith("❌") and state.get("phase") != ConversationPhase.PLAN_READY.value:
+        if not _QUESTION_END_RE.search(response.strip()) and not response.lower().startswith("❌") and state.get("phase") != _PHASE_PLAN_READY:
             response += "\n\nRemember, you can ask me to explain anything further!"
     
     return response
@@ -166,33 +241,88 @@ def adapt_response(response: str, persona: str, state: Dict) -> str:
 # LLM INTERACTION
 # ============================================
 
-def call_llm(messages: List[Dict], temperature: float = 0.7) -> str:
-    """Make a call to the Groq API."""
+_JSON_OBJ_RE = re.compile(r'\{.*\}', re.DOTALL)
+
+
+def call_llm_stream(messages: List[Dict], temperature: float = 0.7, max_tokens: int = CFG.max_tokens) -> Iterator[str]:
+    """Stream a Groq chat completion, yielding content deltas as they arrive."""
+    started = False
+    try:
+        response = client.chat.completions.create(
+            model=CFG.model,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            stream=True
+        )
+        chunk = None
+        for chunk in response:
+            if chunk.choices:
+                delta = chunk.choices[0].delta.content or ""
+                started = started or bool(delta)
+                yield delta
+        if CFG.debug and chunk is not None:
+            log_prompt_cache_usage(chunk)
+    except Exception as e:
+        if started:
+            # The partial text is already on screen; mark it as cut off rather
+            # than running the error message on from mid-sentence
+            yield "\n\n⚠️ (Response cut off: lost the connection to my AI backend.)"
+        else:
+            # Graceful error message for LLM failures
+            yield f"❌ I encountered an error communicating with my AI backend: {str(e)}"
+
+
+def log_prompt_cache_usage(response) -> None:
+    """Print prompt-cache hits from a completion or the final stream chunk (x_groq.usage)."""
+    usage = getattr(getattr(response, "x_groq", None), "usage", None) or getattr(response, "usage", None)
+    if usage is None:
+        return
+    details = getattr(usage, "prompt_tokens_details", None)
+    cached_tokens = getattr(details, "cached_tokens", 0) or 0
+    print(f"DEBUG: LLM prompt_tokens={usage.prompt_tokens} cached_tokens={cached_tokens}")
+
+
+def call_llm(messages: List[Dict], temperature: float = 0.7, max_tokens: int = CFG.max_tokens) -> str:
+    """Make a call to the Groq API and return the full completion."""
     try:
         response = client.chat.completions.create(
-            model=MODEL,
+            model=CFG.model,
             messages=messages,
             temperature=temperature,
-            max_tokens=2000
+            max_tokens=max_tokens
         )
-        return response.choices[0].message.content
+        if CFG.debug:
+            log_prompt_cache_usage(response)
+        return response.choices[0].message.content or ""
     except Exception as e:
         # Graceful error message for LLM failures
         return f"❌ I encountered an error communicating with my AI backend: {str(e)}"
 
 
-def generate_contextual_response(user_message: str, state: Dict, additional_context: str = "") -> str:
-    """Generate a contextual response using the LLM."""
+async def acall_llm(messages: List[Dict], temperature: float = 0.7, max_tokens: int = CFG.max_tokens) -> str:
+    """Async variant of call_llm so several completions can be in flight at once."""
+    try:
+        response = await aclient.chat.completions.create(
+            model=CFG.model,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens
+        )
+        return response.choices[0].message.content or ""
+    except Exception as e:
+        return f"❌ I encountered an error communicating with my AI backend: {str(e)}"
+
+
+def _build_contextual_messages(user_message: str, state: Dict, additional_context: str = "") -> List[Dict]:
+    """Assemble the chat messages for a contextual response."""
     recent_messages = get_recent_context(state, n_messages=6)
     
-    system_prompt = AGENT_SYSTEM_PROMPT.format(
-        current_date=datetime.now().strftime("%Y-%m-%d")
-    )
-    
-    persona = state.get("detected_persona", UserPersona.UNKNOWN.value)
+    persona = state.get("detected_persona", _PERSONA_UNKNOWN)
     style = get_persona_style(persona)
     
-    system_prompt += f"""
+    # Per-turn context lives in its own system message after the static prefix
+    dynamic_context = f"""Current date: {date.today().isoformat()}
 
 Current conversation context:
 - Phase: {state.get('phase')}
@@ -203,102 +333,299 @@ Current conversation context:
 {additional_context}
 """
     
-    messages = [{"role": "system", "content": system_prompt}]
-    
-    for msg in recent_messages:
-        messages.append({"role": msg["role"], "content": msg["content"]})
-    
-    messages.append({"role": "user", "content": user_message})
-    
-    return call_llm(messages)
+    # History entries carry timestamps, so re-wrap them as role/content only
+    return [
+        {"role": "system", "content": AGENT_SYSTEM_PROMPT},
+        {"role": "system", "content": dynamic_context},
+        *({"role": msg["role"], "content": msg["content"]} for msg in recent_messages),
+        {"role": "user", "content": user_message}
+    ]
+
+
+# Token sink for the current agent() turn (its on_token argument), or None
+_turn_on_token: Optional[Callable[[str], None]] = None
+
+
+def generate_contextual_response(user_message: str, state: Dict, additional_context: str = "") -> str:
+    """
+    Generate a contextual response using the LLM. When the current turn has
+    a token sink (agent's on_token), the response is streamed into it too.
+    """
+    on_token = _turn_on_token
+    # adapt_response rewrites the opening for efficient users, so don't show it early
+    if on_token is None or state.get("detected_persona") == _PERSONA_EFFICIENT:
+        return call_llm(_build_contextual_messages(user_message, state, additional_context), max_tokens=CFG.chat_max_tokens)
+    
+    parts = []
+    for delta in generate_contextual_response_stream(user_message, state, additional_context):
+        on_token(delta)
+        parts.append(delta)
+    return "".join(parts)
+
+
+def generate_contextual_response_stream(user_message: str, state: Dict, additional_context: str = "") -> Iterator[str]:
+    """Stream a contextual response token-by-token for progressive display."""
+    yield from call_llm_stream(
+        _build_contextual_messages(user_message, state, additional_context), max_tokens=CFG.chat_max_tokens
+    )
 
 
 # ============================================
 # PLAN GENERATION
 # ============================================
 
-def generate_account_plan(state: Dict, research_result) -> Tuple[Dict, str]:
+PLAN_CACHE_SIZE = 256
+
+# Batch API is only worth its queueing delay for bulk runs
+BATCH_MIN_JOBS = 5
+BATCH_MAX_WAIT = 300.0
+
+# LRU of generated plan sections keyed by (company, formatted research data)
+_PLAN_CACHE: "OrderedDict[Tuple[str, str], Dict]" = OrderedDict()
+
+
+def _build_plan_messages(research_formatted: str) -> List[Dict]:
+    """Build the plan-generation prompt for formatted research data."""
+    return [
+        {"role": "system", "content": "You are an expert business analyst. Generate structured account plans in JSON format only."},
+        {"role": "user", "content": PLAN_GENERATION_PROMPT.format(research_data=research_formatted)}
+    ]
+
+
+def _build_section_messages(section: str, research_formatted: str) -> List[Dict]:
+    """Build the prompt for regenerating a single plan section."""
+    return [
+        {"role": "system", "content": "You are an expert business analyst. Write concise account plan sections."},
+        {"role": "user", "content": SECTION_GENERATION_PROMPT.format(
+            section_title=section.replace("_", " ").upper(),
+            research_data=research_formatted
+        )}
+    ]
+
+
+def _parse_plan_response(response: str) -> Dict:
+    """Extract the plan JSON object from a raw LLM response."""
+    # Locate the JSON object directly, whether or not it is wrapped in a code fence
+    json_match = _JSON_OBJ_RE.search(response)
+    return json_loads(json_match.group(0))
+
+
+def _missing_sections(plan_data: Dict) -> List[str]:
+    """List required sections the LLM left empty."""
+    return [
+        section for section in REQUIRED_PLAN_SECTIONS
+        if not plan_data.get(section) or plan_data[section].strip() == ""
+    ]
+
+
+def _regenerate_section(section: str, research_formatted: str, data: Dict) -> str:
+    """Ask the LLM for one missing section, falling back to template content."""
+    content = call_llm(_build_section_messages(section, research_formatted), temperature=0.5, max_tokens=CFG.section_max_tokens).strip()
+    if not content or content.startswith("❌"):
+        return generate_fallback_section(section, data)
+    return content
+
+
+async def _aregenerate_section(section: str, research_formatted: str, data: Dict) -> str:
+    """Async variant of _regenerate_section."""
+    content = (await acall_llm(
+        _build_section_messages(section, research_formatted), temperature=0.5, max_tokens=CFG.section_max_tokens
+    )).strip()
+    if not content or content.startswith("❌"):
+        return generate_fallback_section(section, data)
+    return content
+
+
+def _fill_missing_sections(plan_data: Dict, research_formatted: str, data: Dict) -> None:
+    """Regenerate empty sections in parallel, one small LLM call per section."""
+    missing = _missing_sections(plan_data)
+    if not missing:
+        return
+    with ThreadPoolExecutor(max_workers=len(missing)) as pool:
+        regenerated = pool.map(lambda section: _regenerate_section(section, research_formatted, data), missing)
+        plan_data.update(zip(missing, regenerated))
+
+
+def _get_cached_plan(key: Tuple[str, str]) -> Optional[Dict]:
+    """Return a fresh copy of a cached plan, or None on a miss."""
+    plan_data = _PLAN_CACHE.get(key)
+    if plan_data is None:
+        return None
+    _PLAN_CACHE.move_to_end(key)
+    return dict(plan_data)
+
+
+def _store_cached_plan(key: Tuple[str, str], plan_data: Dict) -> None:
+    """Remember a successfully generated plan, evicting the oldest entry."""
+    _PLAN_CACHE[key] = dict(plan_data)
+    _PLAN_CACHE.move_to_end(key)
+    if len(_PLAN_CACHE) > PLAN_CACHE_SIZE:
+        _PLAN_CACHE.popitem(last=False)
+
+
+def _stamp_plan(plan_data: Dict, now_iso: Optional[str] = None) -> Dict:
+    """Add generation metadata to a finished plan."""
+    plan_data["generated_at"] = now_iso or datetime.now().isoformat()
+    plan_data["last_updated"] = None
+    plan_data["update_history"] = []
+    return plan_data
+
+
+def generate_account_plan(state: Dict, research_result: ResearchResult) -> Tuple[Dict, str]:
     """Generate an Account Plan from research data."""
     research_formatted = format_research_for_prompt(research_result)
+    
+    # Same company + same research data produces the same prompt; skip the LLM
+    cache_key = (research_result.company_name, research_formatted)
+    cached = _get_cached_plan(cache_key)
+    if cached is not None:
+        return _stamp_plan(cached), "success"
+    
+    response = call_llm(_build_plan_messages(research_formatted), temperature=0.5, max_tokens=CFG.plan_max_tokens)
+    return _complete_plan(response, cache_key, research_formatted, research_result)
+
+
+def _complete_plan(response: str, cache_key: Tuple[str, str], research_formatted: str, research_result: ResearchResult,
+                   now_iso: Optional[str] = None) -> Tuple[Dict, str]:
+    """Parse a plan response, fill missing sections, and cache the result."""
     data = research_result.data or {}
     
-    messages = [
-        {"role": "system", "content": "You are an expert business analyst. Generate structured account plans in JSON format only."},
-        {"role": "user", "content": PLAN_GENERATION_PROMPT.format(research_data=research_formatted)}
-    ]
+    try:
+        plan_data = _parse_plan_response(response)
+        _fill_missing_sections(plan_data, research_formatted, data)
+    except (json.JSONDecodeError, IndexError, AttributeError):
+        return generate_fallback_plan(data, research_result.company_name, now_iso), "partial"
+    
+    _store_cached_plan(cache_key, plan_data)
+    return _stamp_plan(plan_data, now_iso), "success"
+
+
+async def agenerate_account_plan(state: Dict, research_result: ResearchResult, now_iso: Optional[str] = None) -> Tuple[Dict, str]:
+    """Async variant of generate_account_plan for batch/parallel workflows."""
+    research_formatted = format_research_for_prompt(research_result)
+    data = research_result.data or {}
+    
+    cache_key = (research_result.company_name, research_formatted)
+    cached = _get_cached_plan(cache_key)
+    if cached is not None:
+        return _stamp_plan(cached, now_iso), "success"
+    
+    response = await acall_llm(_build_plan_messages(research_formatted), temperature=0.5, max_tokens=CFG.plan_max_tokens)
     
     try:
-        response = call_llm(messages, temperature=0.5)
-        
-        json_match = response.strip()
-        if "```json" in json_match:
-            json_match = json_match.split("```json")[1].split("```")[0]
-        elif "```" in json_match:
-            json_match = json_match.split("```")[1].split("```")[0]
-        
-        json_match = json_match.strip()
-        plan_data = json.loads(json_match)
-        
-        required = ["company_overview", "key_products_services", "competitors", "opportunities", "risks"]
-        for section in required:
-            if not plan_data.get(section) or plan_data[section].strip() == "":
-                plan_data[section] = generate_fallback_section(section, data)
-        
-        plan_data["generated_at"] = datetime.now().isoformat()
-        plan_data["last_updated"] = None
-        plan_data["update_history"] = []
-        
-        return plan_data, "success"
-        
+        plan_data = _parse_plan_response(response)
+        missing = _missing_sections(plan_data)
+        if missing:
+            results = await asyncio.gather(
+                *(_aregenerate_section(section, research_formatted, data) for section in missing)
+            )
+            plan_data.update(dict(zip(missing, results)))
     except (json.JSONDecodeError, IndexError, AttributeError):
-        return generate_fallback_plan(data, research_result.company_name), "partial"
+        return generate_fallback_plan(data, research_result.company_name, now_iso), "partial"
+    
+    _store_cached_plan(cache_key, plan_data)
+    return _stamp_plan(plan_data, now_iso), "success"
 
 
-def generate_fallback_section(section: str, data: Dict) -> str:
-    """Generate fallback content for a section."""
-    company_name = data.get("name", "This company")
-    industry = data.get("industry", "their industry")
+async def generate_account_plans_batch(jobs: List[Tuple[Dict, ResearchResult]], max_wait: float = BATCH_MAX_WAIT) -> List[Tuple[Dict, str]]:
+    """
+    Generate plans for many (state, research_result) jobs at once.
+    Large runs go through the Groq Batch API; anything it does not return in
+    time is generated with concurrent regular calls instead.
+    """
+    results: List[Optional[Tuple[Dict, str]]] = [None] * len(jobs)
+    pending = []
+    # One timestamp for the whole batch instead of one per plan
+    now_iso = datetime.now().isoformat()
+    
+    for index, (state, research_result) in enumerate(jobs):
+        research_formatted = format_research_for_prompt(research_result)
+        cache_key = (research_result.company_name, research_formatted)
+        cached = _get_cached_plan(cache_key)
+        if cached is not None:
+            results[index] = (_stamp_plan(cached, now_iso), "success")
+        else:
+            pending.append((index, cache_key, research_formatted, research_result))
     
-    fallbacks = {
-        "company_overview": data.get("description", f"{company_name} is a company operating in {industry}."),
-        "key_products_services": ", ".join(data.get("products", []) + data.get("services", [])) or f"{company_name} offers various products and services in {industry}.",
-        "competitors": ", ".join(data.get("competitors", [])) or f"Key competitors include other major players in {industry}.",
-        "opportunities": f"Opportunities include digital transformation initiatives, market expansion, strategic partnerships, and leveraging emerging technologies in {industry}.",
-        "risks": f"Key risks include competitive pressure, market volatility, regulatory changes, technology disruption, and talent acquisition challenges in {industry}."
-    }
-    return fallbacks.get(section, "Information to be added.")
+    loop = asyncio.get_running_loop()
+    
+    if len(pending) >= BATCH_MIN_JOBS:
+        batch_requests = [
+            {"custom_id": str(index), "messages": _build_plan_messages(research_formatted),
+             "temperature": 0.5, "max_tokens": CFG.plan_max_tokens}
+            for index, _, research_formatted, _ in pending
+        ]
+        outputs = await loop.run_in_executor(None, run_chat_batch, client, batch_requests, CFG.model, max_wait)
+        
+        if outputs:
+            for index, cache_key, research_formatted, research_result in pending:
+                if str(index) in outputs:
+                    results[index] = await loop.run_in_executor(
+                        None, _complete_plan, outputs[str(index)], cache_key, research_formatted, research_result, now_iso
+                    )
+    
+    # Small runs, batch timeouts and failed lines fan out as regular async calls
+    leftover = [index for index, result in enumerate(results) if result is None]
+    if leftover:
+        generated = await asyncio.gather(*(agenerate_account_plan(*jobs[index], now_iso=now_iso) for index in leftover))
+        for index, result in zip(leftover, generated):
+            results[index] = result
+    
+    return results
 
 
-def generate_fallback_plan(data: Dict, company_name: str) -> Dict:
+def generate_fallback_section(section: str, data: Dict) -> str:
+    """Generate fallback content for a section."""
+    name = data.get("name", "This company")
+    ind = data.get("industry", "their industry")
+    
+    # Only build the requested section's text
+    if section == "company_overview":
+        return data.get("description", f"{name} is a company operating in {ind}.")
+    if section == "key_products_services":
+        return ", ".join(chain(data.get("products") or (), data.get("services") or ())) or f"{name} offers various products and services in {ind}."
+    if section == "competitors":
+        return ", ".join(data.get("competitors") or ()) or f"Key competitors include other major players in {ind}."
+    if section == "opportunities":
+        return f"Opportunities include digital transformation initiatives, market expansion, strategic partnerships, and leveraging emerging technologies in {ind}."
+    if section == "risks":
+        return f"Key risks include competitive pressure, market volatility, regulatory changes, technology disruption, and talent acquisition challenges in {ind}."
+    return "Information to be added."
+
+
+def generate_fallback_plan(data: Dict, company_name: str, now_iso: Optional[str] = None) -> Dict:
     """Generate a complete fallback plan when LLM fails."""
     industry = data.get("industry", "their industry")
     
     return {
         "company_overview": data.get("description", f"{company_name} is a company in {industry}."),
-        "key_products_services": ", ".join(data.get("products", []) + data.get("services", [])) or "Products and services information to be updated.",
+        "key_products_services": ", ".join(chain(data.get("products") or (), data.get("services") or ())) or "Products and services information to be updated.",
         "competitors": ", ".join(data.get("competitors", [])) or "Competitor information to be updated.",
         "opportunities": f"Potential opportunities for {company_name} include: digital transformation initiatives, expansion into new markets, strategic technology partnerships, and innovation in {industry}.",
         "risks": f"Key risks for {company_name} include: competitive pressure from established and emerging players, regulatory and compliance challenges, market volatility, cybersecurity threats, and talent retention in {industry}.",
-        "generated_at": datetime.now().isoformat(),
+        "generated_at": now_iso or datetime.now().isoformat(),
         "last_updated": None,
         "update_history": []
     }
 
 
+_VALID_SECTIONS = {
+    "company_overview": "Company Overview",
+    "key_products_services": "Key Products/Services",
+    "competitors": "Competitors",
+    "opportunities": "Opportunities",
+    "risks": "Risks"
+}
+_VALID_SECTION_KEYS = frozenset(_VALID_SECTIONS)
+_VALID_SECTION_TITLES = ", ".join(_VALID_SECTIONS.values())
+
+
 def update_plan_section(state: Dict, section: str, new_content: str) -> Tuple[bool, str]:
     """Update a specific section of the Account Plan."""
-    valid_sections = {
-        "company_overview": "Company Overview",
-        "key_products_services": "Key Products/Services",
-        "competitors": "Competitors",
-        "opportunities": "Opportunities",
-        "risks": "Risks"
-    }
-    
-    section_key = section.lower().replace(" ", "_").replace("/", "_")
+    section_key = section_key_for(section)
     
-    if section_key not in valid_sections:
-        return False, f"Unknown section: **{section}**. Valid sections are: {', '.join(valid_sections.values())}"
+    if section_key not in _VALID_SECTION_KEYS:
+        return False, f"Unknown section: **{section}**. Valid sections are: {_VALID_SECTION_TITLES}"
     
     if not state.get("account_plan") or not state["account_plan"].get("company_overview"):
         return False, "No Account Plan exists yet. Please research a company first by saying 'Research [Company Name]'."
@@ -306,110 +633,189 @@ def update_plan_section(state: Dict, section: str, new_content: str) -> Tuple[bo
     old_content = state["account_plan"].get(section_key, "")
     set_plan_section(state, section_key, new_content)
     
-    return True, f"Updated **{valid_sections[section_key]}** section successfully."
+    return True, f"Updated **{_VALID_SECTIONS[section_key]}** section successfully."
 
 
 # ============================================
 # INTENT HANDLERS
 # ============================================
 
-def handle_research_request(user_message: str, state: Dict, normalized_company: str = None) -> Tuple[str, Dict]:
+_RESEARCH_PREFIX_RE = re.compile(r'^(research|look up|find|analyze|tell me about|information on|learn about)\s+', re.IGNORECASE)
+_PROPER_NAME_RE = re.compile(r'^[A-Z][A-Za-z0-9 .&-]{1,40}$')
+_DISAMBIG_NUM_RE = re.compile(r'^(\d+)\.?$|^option\s*(\d+)$|^(\d+)\s*[-:.)]', re.ASCII)
+
+_POSITIVE_WORDS = frozenset({"yes", "y", "yep", "yup", "sure", "ok", "okay", "correct", "right", "proceed", "go ahead", "continue"})
+_NEGATIVE_WORDS = frozenset({"no", "n", "nope", "nah", "wrong", "incorrect", "cancel", "stop"})
+_ORDINALS = (
+    ("first", 0), ("second", 1), ("third", 2), ("fourth", 3), ("fifth", 4),
+    ("1st", 0), ("2nd", 1), ("3rd", 2)
+)
+_NON_COMPANY_UNION = NON_COMPANY_WORDS | NAME_STOP_WORDS
+
+# Recent-context strings for the current turn, keyed by message count; kept
+# out of state and cleared by _agent_turn
+_turn_context_cache: Dict[int, str] = {}
+
+
+def _get_cached_recent_context(state: Dict, n_messages: int = 3) -> str:
+    """Recent message contents joined by newlines, built at most once per agent() turn."""
+    context = _turn_context_cache.get(n_messages)
+    if context is None:
+        context = "\n".join(m.get("content", "") for m in get_recent_context(state, n_messages))
+        _turn_context_cache[n_messages] = context
+    return context
+
+
+# Persona-specific closing for a finished research response. Builders take the
+# plan so EFFICIENT users never pay for formatting a summary they don't see.
+_PERSONA_TAIL_BUILDERS: Dict[str, Callable[[Dict], str]] = {
+    _PERSONA_EFFICIENT: lambda plan: "Plan Ready. Use 'Show plan' to view the full details.",
+    _PERSONA_CONFUSED: lambda plan: (
+        f"Here is the plan. Take a look at the **Company Overview** and **Key Products/Services** sections below to get started.\n\n{format_account_plan(plan)}"
+        "\n\nWhat section would you like to review or update next? (e.g., 'Update risks with...')"
+    ),
+    # UNKNOWN/CHATTY
+    "default": lambda plan: (
+        f"Here is the full Account Plan:\n\n{format_account_plan(plan)}"
+        "\n\nYou can update any section by saying something like:\n"
+        "'Update risks with: Supply chain vulnerabilities due to global dependencies'"
+    )
+}
+
+
+# Speculative research: while the user reads a "Did you mean X?" prompt, fetch X
+# in the background so a "yes" finds the data ready (or already in flight).
+_PREFETCH_POOL = ThreadPoolExecutor(max_workers=2, thread_name_prefix="research-prefetch")
+# Only the company in a pending confirmation is prefetched, so a handful is plenty
+MAX_PREFETCHES = 4
+_prefetches: Dict[str, "Future[ResearchResult]"] = {}
+
+
+def _start_prefetch(company_name: str) -> None:
+    """Begin fetching research data for a company the user is likely to confirm."""
+    key = canonicalize(company_name)
+    if key not in _prefetches:
+        while len(_prefetches) >= MAX_PREFETCHES:
+            _prefetches.pop(next(iter(_prefetches))).cancel()
+        _prefetches[key] = _PREFETCH_POOL.submit(cached_fetch_company_data, company_name)
+
+
+def _take_prefetch(company_name: str) -> Optional[ResearchResult]:
+    """Return the prefetched ResearchResult for a company, waiting if still in flight."""
+    future = _prefetches.pop(canonicalize(company_name), None)
+    if future is None or future.cancelled():
+        return None
+    try:
+        return future.result()
+    except Exception:
+        return None
+
+
+def _cancel_prefetch(company_name: str) -> None:
+    """Drop a prefetch no longer needed; a fetch already running just warms the cache."""
+    future = _prefetches.pop(canonicalize(company_name), None)
+    if future is not None:
+        future.cancel()
+
+
+def _execute_research(company_name: str, state: Dict, *, validate: bool, handle_conflicts: bool) -> Tuple[str, Dict]:
     """
-    Handles research when the intent is explicitly 'research'.
-    This function should only be called *after* confirmation/disambiguation,
-    or if a simple, high-confidence name was passed.
+    Shared research -> plan pipeline. `validate` checks the name and asks
+    before planning on weak data; `handle_conflicts` offers disambiguation.
     """
+    if validate:
+        # Validate company name
+        is_valid, result = validate_company_name(company_name)
+        if not is_valid:
+            return (
+                f"❌ I had trouble with that company name: **{result}**\nCould you please provide a valid company name?",
+                state
+            )
+        company_name = result
     
-    # CRITICAL FIX: If we are called without a pre-normalized company,
-    # it means the agent's initial intent routing was 'research'.
-    # We must now call handle_potential_research to get the confirmation logic.
-    if normalized_company is None:
-        # Redirect to potential research logic for full extraction and confirmation check.
-        return handle_potential_research(user_message, state)
-
-    
-    # --- START of direct research execution (runs after confirmation) ---
-    company_name = normalized_company
-    
-    # Validate company name
-    is_valid, result = validate_company_name(company_name)
-    if not is_valid:
-        return (
-            f"❌ I had trouble with that company name: **{result}**\nCould you please provide a valid company name?",
-            state
-        )
-    
-    company_name = result
     state["target_company"] = company_name
     set_phase(state, ConversationPhase.RESEARCHING)
     
-    progress_msg = f"🔍 Researching **{company_name}**...\n"
+    parts = [f"🔍 Researching **{company_name}**...\n"]
     
-    research_result = fetch_company_data(company_name)
+    research_result = _take_prefetch(company_name) or cached_fetch_company_data(company_name)
     
     if not research_result.success:
-        progress_msg += f"\n⚠️ I found limited information about **{company_name}**. "
-        progress_msg += "Would you like me to proceed with what I found, or would you like to try a different company name?"
-        set_phase(state, ConversationPhase.CLARIFYING)
-        state["research_data"]["raw_data"] = research_result.data
-        state["research_data"]["confidence_score"] = research_result.confidence
-        state["pending_clarification"] = {"type": "low_confidence", "company": company_name}
-        return progress_msg, state
+        parts.append(f"\n⚠️ I found limited information about **{company_name}**. ")
+        if validate:
+            parts.append("Would you like me to proceed with what I found, or would you like to try a different company name?")
+            set_phase(state, ConversationPhase.CLARIFYING)
+            state["research_data"]["raw_data"] = dict(research_result.data) if research_result.data is not None else None
+            state["research_data"]["confidence_score"] = research_result.confidence
+            state["pending_clarification"] = PendingClarification(kind="low_confidence", company=company_name)
+            return "".join(parts), state
+        parts.append("I'll generate a basic plan with what I found, but you should review and update sections manually.")
     
     # Check for conflicts (multiple matches)
-    if research_result.conflicts:
-        conflict_msg = f"\n⚠️ I found multiple matches for '*{company_name}*':\n"
+    if handle_conflicts and research_result.conflicts:
+        parts.append(f"\n⚠️ I found multiple matches for '*{company_name}*':\n")
         for conflict in research_result.conflicts:
             if conflict["type"] == "ambiguous_name":
-                for i, option in enumerate(conflict["options"][:5], 1):
-                    conflict_msg += f"  {i}. {option}\n"
-        conflict_msg += "\nWhich company did you mean? (Enter the number or type the name)"
+                parts.extend(f"  {i}. {option}\n" for i, option in enumerate(conflict["options"][:5], 1))
+        parts.append("\nWhich company did you mean? (Enter the number or type the name)")
         
-        state["pending_clarification"] = {
-            "type": "company_disambiguation",
-            "options": research_result.conflicts[0].get("options", [])[:5]
-        }
+        options = tuple(research_result.conflicts[0].get("options", ())[:5])
+        state["pending_clarification"] = PendingClarification(
+            kind="company_disambiguation",
+            options=options,
+            # Lowercased once here so retries don't re-lower every option
+            options_lower=tuple(opt.lower() for opt in options)
+        )
         set_phase(state, ConversationPhase.CLARIFYING)
-        return progress_msg + conflict_msg, state
+        return "".join(parts), state
     
     # Store research data
     state["research_data"]["raw_data"] = normalize_research_data(research_result.data)
     state["research_data"]["confidence_score"] = research_result.confidence
-    state["research_data"]["sources"] = research_result.sources
-    state["research_data"]["data_gaps"] = research_result.gaps
+    # Results can be shared (mock hits, the research cache), so state gets its own lists
+    state["research_data"]["sources"] = list(research_result.sources)
+    state["research_data"]["data_gaps"] = list(research_result.gaps)
     
-    progress_msg += f"✅ Found information about **{research_result.company_name}**.\n"
-    progress_msg += f"📊 Data confidence: {research_result.confidence:.0%}\n"
+    if research_result.success:
+        parts.append(f"✅ Found information about **{research_result.company_name}**.\n")
+        parts.append(f"📊 Data confidence: {research_result.confidence:.0%}\n")
     
     if research_result.gaps:
-        progress_msg += f"📝 Note: Limited data for: {', '.join(research_result.gaps)}\n"
+        parts.append(f"📝 Note: Limited data for: {', '.join(research_result.gaps)}\n")
     
-    progress_msg += "\nGenerating Account Plan...\n"
+    parts.append("\nGenerating Account Plan...\n")
     
     plan, status = generate_account_plan(state, research_result)
     state["account_plan"] = plan
     set_phase(state, ConversationPhase.PLAN_READY)
     
     if status == "partial":
-        progress_msg += "⚠️ Generated a basic plan. Some sections may need manual enrichment.\n"
+        parts.append("⚠️ Generated a basic plan. Some sections may need manual enrichment.\n")
     else:
-        progress_msg += "✅ Account Plan generated successfully!\n"
+        parts.append("✅ Account Plan generated successfully!\n")
     
     # Adapt the plan summary presentation for different personas
-    persona = state.get("detected_persona", UserPersona.UNKNOWN.value)
-    plan_summary = format_account_plan(state["account_plan"])
+    persona = state.get("detected_persona", _PERSONA_UNKNOWN)
+    parts.append(_PERSONA_TAIL_BUILDERS.get(persona, _PERSONA_TAIL_BUILDERS["default"])(state["account_plan"]))
     
-    if persona == UserPersona.EFFICIENT.value:
-        progress_msg += "Plan Ready. Use 'Show plan' to view the full details."
-    elif persona == UserPersona.CONFUSED.value:
-        progress_msg += f"Here is the plan. Take a look at the **Company Overview** and **Key Products/Services** sections below to get started.\n\n{plan_summary}"
-        progress_msg += "\n\nWhat section would you like to review or update next? (e.g., 'Update risks with...')"
-    else: # UNKNOWN/CHATTY
-        progress_msg += f"Here is the full Account Plan:\n\n{plan_summary}"
-        progress_msg += "\n\nYou can update any section by saying something like:\n"
-        progress_msg += "'Update risks with: Supply chain vulnerabilities due to global dependencies'"
+    return "".join(parts), state
+
+
+def handle_research_request(user_message: str, state: Dict, normalized_company: Optional[str] = None) -> Tuple[str, Dict]:
+    """
+    Handles research when the intent is explicitly 'research'.
+    This function should only be called *after* confirmation/disambiguation,
+    or if a simple, high-confidence name was passed.
+    """
     
-    return progress_msg, state
+    # CRITICAL FIX: If we are called without a pre-normalized company,
+    # it means the agent's initial intent routing was 'research'.
+    # We must now call handle_potential_research to get the confirmation logic.
+    if normalized_company is None:
+        # Redirect to potential research logic for full extraction and confirmation check.
+        return handle_potential_research(user_message, state)
+    
+    return _execute_research(normalized_company, state, validate=True, handle_conflicts=True)
 
 
 def handle_confirmation_response(user_message: str, state: Dict) -> Tuple[bool, str, Dict]:
@@ -420,41 +826,38 @@ def handle_confirmation_response(user_message: str, state: Dict) -> Tuple[bool,
     
     msg_lower = user_message.lower().strip()
     
-    # Check for positive confirmation
-    positive_words = {"yes", "y", "yep", "yup", "sure", "ok", "okay", "correct", "right", "proceed", "go ahead", "continue"}
-    negative_words = {"no", "n", "nope", "nah", "wrong", "incorrect", "cancel", "stop"}
-    
-    if pending.get("type") == "company_confirmation":
-        company = pending.get("company")
+    if pending.kind == "company_confirmation":
+        company = pending.company
         
-        if msg_lower in positive_words:
+        if msg_lower in _POSITIVE_WORDS:
             state["pending_clarification"] = None
             # Now we call handle_research_request with the confirmed name
             response, new_state = handle_research_request("", state, normalized_company=company)
             return True, response, new_state
         
-        if msg_lower in negative_words:
+        if msg_lower in _NEGATIVE_WORDS:
             state["pending_clarification"] = None
             set_phase(state, ConversationPhase.GATHERING_COMPANY)
             
             # IMPROVEMENT: Check if user provided a new company name in the same turn (e.g., "No, I meant Deloitte")
-            extraction = extract_company_with_llm(user_message, "\n".join([m.get("content", "") for m in get_recent_context(state, 3)]))
+            extraction = cached_extract_company_with_llm(user_message, _get_cached_recent_context(state, 3))
             if extraction.get("is_company_query") and extraction.get("extracted_company") and extraction["extracted_company"] != company:
                 new_company = extraction["extracted_company"]
-                return True, f"Understood. Let me research **{new_company}** for you.", handle_research_request("", state, normalized_company=new_company)[1]
+                response, new_state = handle_research_request("", state, normalized_company=new_company)
+                return True, f"Understood, researching **{new_company}** instead.\n\n{response}", new_state
 
             return True, "No problem! Please tell me the correct company name you'd like to research.", state
     
-    if pending.get("type") == "low_confidence":
-        company = pending.get("company")
+    if pending.kind == "low_confidence":
+        company = pending.company
         
-        if msg_lower in positive_words:
+        if msg_lower in _POSITIVE_WORDS:
             state["pending_clarification"] = None
             # Force proceed with limited data
             response, new_state = handle_direct_research(company, state)
             return True, response, new_state
         
-        if msg_lower in negative_words:
+        if msg_lower in _NEGATIVE_WORDS:
             state["pending_clarification"] = None
             set_phase(state, ConversationPhase.GATHERING_COMPANY)
             return True, "No problem! Please provide a different company name to research.", state
@@ -465,18 +868,25 @@ def handle_confirmation_response(user_message: str, state: Dict) -> Tuple[bool,
 def handle_disambiguation_response(user_message: str, state: Dict) -> Tuple[bool, str, Dict]:
     """Handle user response to a disambiguation prompt."""
     pending = state.get("pending_clarification")
-    if not pending or pending.get("type") != "company_disambiguation":
+    if not pending or pending.kind != "company_disambiguation":
         return False, "", state
     
-    options = pending.get("options", [])
+    options = pending.options
     if not options:
         return False, "", state
     
     user_input = user_message.strip().lower()
     selected_company = None
     
+    # Fast path: a single digit answer like "2" or "2." / "2)" needs no regex
+    first = user_input[:1]
+    if "1" <= first <= "9" and (len(user_input) == 1 or user_input[1] in ".:-)"):
+        idx = ord(first) - ord("1")
+        if idx < len(options):
+            selected_company = options[idx]
+    
     # Check for numeric selection
-    number_match = re.search(r'^(\d+)\.?$|^option\s*(\d+)$|^(\d+)\s*[-:.)]', user_input)
+    number_match = None if selected_company else _DISAMBIG_NUM_RE.search(user_input)
     if number_match:
         num_str = number_match.group(1) or number_match.group(2) or number_match.group(3)
         try:
@@ -488,16 +898,15 @@ def handle_disambiguation_response(user_message: str, state: Dict) -> Tuple[bool
     
     # Check for direct name match
     if not selected_company:
-        for opt in options:
+        for opt, opt_lower in zip(options, pending.options_lower):
             # Check for case-insensitive exact match or close match
-            if opt.lower() == user_input or opt.lower() in user_input or user_input in opt.lower():
+            if opt_lower == user_input or opt_lower in user_input or user_input in opt_lower:
                 selected_company = opt
                 break
     
     # Check for ordinals
     if not selected_company:
-        ordinals = {"first": 0, "second": 1, "third": 2, "fourth": 3, "fifth": 4, "1st": 0, "2nd": 1, "3rd": 2}
-        for word, idx in ordinals.items():
+        for word, idx in _ORDINALS:
             if word in user_input and idx < len(options):
                 selected_company = options[idx]
                 break
@@ -517,55 +926,7 @@ def handle_direct_research(company_name: str, state: Dict) -> Tuple[str, Dict]:
     Handles research execution for confirmed/unambiguous company names.
     This bypasses the extraction/confirmation logic.
     """
-    state["target_company"] = company_name
-    set_phase(state, ConversationPhase.RESEARCHING)
-    
-    progress_msg = f"🔍 Researching **{company_name}**...\n"
-    
-    research_result = fetch_company_data(company_name)
-    
-    if not research_result.success:
-        progress_msg += f"\n⚠️ I found limited information about **{company_name}**. "
-        progress_msg += "I'll generate a basic plan with what I found, but you should review and update sections manually."
-    
-    state["research_data"]["raw_data"] = normalize_research_data(research_result.data)
-    state["research_data"]["confidence_score"] = research_result.confidence
-    state["research_data"]["sources"] = research_result.sources
-    state["research_data"]["data_gaps"] = research_result.gaps
-    
-    if research_result.success:
-        progress_msg += f"✅ Found information about **{research_result.company_name}**.\n"
-        progress_msg += f"📊 Data confidence: {research_result.confidence:.0%}\n"
-    
-    if research_result.gaps:
-        progress_msg += f"📝 Note: Limited data for: {', '.join(research_result.gaps)}\n"
-    
-    progress_msg += "\nGenerating Account Plan...\n"
-    
-    plan, status = generate_account_plan(state, research_result)
-    state["account_plan"] = plan
-    set_phase(state, ConversationPhase.PLAN_READY)
-    
-    if status == "partial":
-        progress_msg += "⚠️ Generated a basic plan. Some sections may need manual enrichment.\n"
-    else:
-        progress_msg += "✅ Account Plan generated successfully!\n"
-    
-    # Adapt the plan summary presentation for different personas
-    persona = state.get("detected_persona", UserPersona.UNKNOWN.value)
-    plan_summary = format_account_plan(state["account_plan"])
-    
-    if persona == UserPersona.EFFICIENT.value:
-        progress_msg += "Plan Ready. Use 'Show plan' to view the full details."
-    elif persona == UserPersona.CONFUSED.value:
-        progress_msg += f"Here is the plan. Take a look at the **Company Overview** and **Key Products/Services** sections below to get started.\n\n{plan_summary}"
-        progress_msg += "\n\nWhat section would you like to review or update next? (e.g., 'Update risks with...')"
-    else: # UNKNOWN/CHATTY
-        progress_msg += f"Here is the full Account Plan:\n\n{plan_summary}"
-        progress_msg += "\n\nYou can update any section by saying something like:\n"
-        progress_msg += "'Update risks with: Supply chain vulnerabilities due to global dependencies'"
-    
-    return progress_msg, state
+    return _execute_research(company_name, state, validate=False, handle_conflicts=False)
 
 
 def handle_update_request(user_message: str, state: Dict) -> Tuple[str, Dict]:
@@ -592,7 +953,7 @@ def handle_update_request(user_message: str, state: Dict) -> Tuple[str, Dict]:
     if success:
         response = f"✅ {message}\n\nHere's the updated plan:\n\n"
         # For efficiency, only show the updated section for efficient users
-        if state.get("detected_persona") == UserPersona.EFFICIENT.value:
+        if state.get("detected_persona") == _PERSONA_EFFICIENT:
             updated_section_content = state["account_plan"].get(section)
             response = f"✅ {message}\n\n**Updated Content:**\n{updated_section_content}\n\nUse 'Show plan' to see the full document."
         else:
@@ -617,9 +978,9 @@ def handle_view_plan(state: Dict) -> Tuple[str, Dict]:
 
 def handle_help_request(state: Dict) -> Tuple[str, Dict]:
     """Handle help requests."""
-    persona = state.get("detected_persona", UserPersona.UNKNOWN.value)
+    persona = state.get("detected_persona", _PERSONA_UNKNOWN)
     
-    if persona == UserPersona.EFFICIENT.value:
+    if persona == _PERSONA_EFFICIENT:
         return "Commands: Research [company], Show plan, Update [section] with: [content], Exit", state
     
     help_text = """
@@ -656,10 +1017,10 @@ What would you like to do?
 
 def handle_greeting(state: Dict) -> Tuple[str, Dict]:
     """Handle greeting messages, including hesitant ones."""
-    persona = state.get("detected_persona", UserPersona.UNKNOWN.value)
+    persona = state.get("detected_persona", _PERSONA_UNKNOWN)
     
     # Check if this seems like a confused/hesitant user
-    if persona == UserPersona.CONFUSED.value:
+    if persona == _PERSONA_CONFUSED:
         return (
             "Hello! 👋 No worries if you're not sure where to start - I'm here to guide you, step-by-step.\n\n"
             "I'm your Company Research Assistant. Just tell me a company name like 'Microsoft' or 'Apple' and I'll start researching!\n\n"
@@ -667,7 +1028,7 @@ def handle_greeting(state: Dict) -> Tuple[str, Dict]:
             set_phase(state, ConversationPhase.GATHERING_COMPANY)
         )
     
-    if persona == UserPersona.EFFICIENT.value:
+    if persona == _PERSONA_EFFICIENT:
         return "Hello! Which company would you like to research today?", state
     
     if state.get("target_company"):
@@ -700,9 +1061,9 @@ def handle_off_topic(user_message: str, state: Dict) -> Tuple[str, Dict]:
     """Handle off-topic messages with gentle redirection."""
     update_persona_signals(state, "off_topic_count")
     
-    persona = state.get("detected_persona", UserPersona.UNKNOWN.value)
+    persona = state.get("detected_persona", _PERSONA_UNKNOWN)
     
-    if persona == UserPersona.EFFICIENT.value:
+    if persona == _PERSONA_EFFICIENT:
         return "I'm focused on company research. Which company should I research?", state
     
     redirect_responses = [
@@ -725,7 +1086,7 @@ def handle_unclear(user_message: str, state: Dict) -> Tuple[str, Dict]:
     phase = state.get("phase")
     
     # PRIORITY 1: Check for pending clarifications (should have been handled in agent() but is a robust fallback)
-    if phase == ConversationPhase.CLARIFYING.value:
+    if phase == _PHASE_CLARIFYING:
         # Check if the message can resolve a pending clarification
         was_handled, response, state = handle_confirmation_response(user_message, state)
         if was_handled: return response, state
@@ -735,10 +1096,9 @@ def handle_unclear(user_message: str, state: Dict) -> Tuple[str, Dict]:
         
         # If still pending, repeat the last question
         pending = state.get("pending_clarification")
-        if pending and pending.get("type") == "company_disambiguation":
-            options = pending.get("options", [])
+        if pending and pending.kind == "company_disambiguation":
             return (
-                f"I'm sorry, I didn't catch that. Please enter the number (1-{len(options)}) or type the company name to continue.",
+                f"I'm sorry, I didn't catch that. Please enter the number (1-{len(pending.options)}) or type the company name to continue.",
                 state
             )
 
@@ -753,7 +1113,7 @@ def handle_unclear(user_message: str, state: Dict) -> Tuple[str, Dict]:
         return handle_research_request("", state, normalized_company=resolved)
     
     # PRIORITY 4: Use LLM for a helpful, contextual answer
-    if phase == ConversationPhase.GATHERING_COMPANY.value:
+    if phase == _PHASE_GATHERING:
         return (
             "I'm not sure I understood. Are you trying to tell me a company name to research?\n"
             "You can simply type the company name, like **'Microsoft'** or **'Tesla'**.\n\n"
@@ -769,14 +1129,173 @@ def handle_unclear(user_message: str, state: Dict) -> Tuple[str, Dict]:
     ), state
 
 
+def handle_potential_research(user_message: str, state: Dict) -> Tuple[str, Dict]:
+    """
+    Unified function to extract company names, check for confirmation needs (alias/fuzzy match), 
+    and then either enter clarification phase or proceed to research execution.
+    """
+    msg_lower = user_message.lower().strip()
+    
+    # CRITICAL FIX: If the message contains explicit confusion signals, route to handle_unclear
+    if detect_confusion_signals(user_message):
+        return handle_unclear(user_message, state)
+    
+    # Strip filler words to check underlying intent
+    msg_stripped = strip_filler_prefix(msg_lower)
+    
+    # Don't treat common non-company words as companies
+    is_non_company = msg_lower in _NON_COMPANY_UNION or msg_stripped in NON_COMPANY_WORDS
+    
+    if is_non_company:
+        return handle_unclear(user_message, state)
+    
+    # IMPROVEMENT: Pre-clean the message to remove 'research' command words
+    search_terms = _RESEARCH_PREFIX_RE.sub('', user_message.strip(), count=1).strip()
+    
+    # FAST PATH: deterministic matches skip the LLM round trip entirely
+    candidate = clean_input(search_terms)
+    known_company = match_known_company(candidate)
+    if known_company:
+        return handle_direct_research(known_company, state)
+    
+    # A short capitalized name that is neither an alias nor a near-miss of a
+    # known company may be a company we just don't have listed. Title-cased
+    # chat ("Hello There", "Quarterly Revenue") looks the same, so the user
+    # confirms it below instead of it going straight to research.
+    if (_PROPER_NAME_RE.match(candidate) and len(candidate.split()) <= 3
+            and not match_company_alias(candidate)
+            and not fuzzy_match_company(candidate, threshold=75)):
+        extraction = {
+            "is_company_query": True,
+            "extracted_company": candidate,
+            "corrected_from": None,
+            "confidence": 0.7,
+            "reasoning": f"'{candidate}' looks like an unlisted company name",
+            "is_alias_match": False
+        }
+    else:
+        # Use LLM-based extraction (where the alias check happens)
+        context = _get_cached_recent_context(state, 3)
+        extraction = cached_extract_company_with_llm(search_terms, context)
+    
+    if extraction.get("is_company_query") and extraction.get("extracted_company"):
+        
+        is_alias = extraction.get("is_alias_match", False)
+        
+        # Check if we need confirmation for misspellings, low confidence, OR ALIAS MATCH
+        if needs_confirmation(extraction) or is_alias:
+            
+            # Pass alias info to state for a cleaner flow
+            state["pending_clarification"] = PendingClarification(
+                kind="company_confirmation",
+                company=extraction["extracted_company"],
+                original_input=user_message,
+                confidence=extraction.get("confidence", 0),
+                is_alias=is_alias # Flag set here for alias match
+            )
+            set_phase(state, ConversationPhase.CLARIFYING)
+            _start_prefetch(extraction["extracted_company"])
+            return format_confirmation_message(extraction), state
+        
+        # If confidence is high AND no clarification needed, proceed directly to execution
+        return handle_direct_research(extraction["extracted_company"], state)
+    
+    # Try fuzzy matching as fallback (only for non-research commands)
+    if not msg_lower.startswith("research"):
+        fuzzy_result = fuzzy_match_company(user_message, threshold=75, query_lower=msg_lower)
+        if fuzzy_result:
+            matched, score = fuzzy_result
+            if score >= 85:
+                return handle_direct_research(matched, state)
+            else:
+                # Ask for confirmation
+                state["pending_clarification"] = PendingClarification(
+                    kind="company_confirmation",
+                    company=matched,
+                    original_input=user_message,
+                    confidence=score / 100.0,
+                    is_alias=False
+                )
+                set_phase(state, ConversationPhase.CLARIFYING)
+                _start_prefetch(matched)
+                return (
+                    f"Did you mean **{matched}**?\n"
+                    "Please reply 'yes' to confirm or provide the correct company name.",
+                    state
+                )
+
+    # Not recognized as a company
+    # Final Fallback: If it's more than one word, assume it's a non-mock company name and research it (low confidence expected)
+    if len(user_message.split()) > 1 and len(user_message) > 5 and not is_non_company:
+        return handle_direct_research(user_message, state)
+    
+    # Truly unclear/single word input that wasn't matched
+    return handle_unclear(user_message, state)
+
+
+# Dispatch table: every entry takes (user_message, state); intents that
+# ignore the message get a thin adapter that drops it.
+
+def _greeting_adapter(user_message: str, state: Dict) -> Tuple[str, Dict]:
+    return handle_greeting(state)
+
+
+def _farewell_adapter(user_message: str, state: Dict) -> Tuple[str, Dict]:
+    return handle_farewell(state)
+
+
+def _help_adapter(user_message: str, state: Dict) -> Tuple[str, Dict]:
+    return handle_help_request(state)
+
+
+def _view_plan_adapter(user_message: str, state: Dict) -> Tuple[str, Dict]:
+    return handle_view_plan(state)
+
+
+_INTENT_HANDLERS = {
+    "greeting": _greeting_adapter,
+    "farewell": _farewell_adapter,
+    "help": _help_adapter,
+    "view_plan": _view_plan_adapter,
+    "update": handle_update_request,
+    # Intent 'research' and 'potential_research' now both map to the same logic:
+    "research": handle_potential_research,
+    "potential_research": handle_potential_research,
+    "off_topic": handle_off_topic,
+    "unclear": handle_unclear
+}
+
+
 # ============================================
 # MAIN AGENT FUNCTION
 # ============================================
 
-def agent(user_message: str, state: Dict) -> Tuple[str, Dict]:
+def agent(user_message: str, state: Dict, on_token: Optional[Callable[[str], None]] = None) -> Tuple[str, Dict]:
     """
     Main agent function that processes user input and returns a response.
+    If on_token is given, LLM-written replies are also passed to it token by
+    token as they arrive; the returned response is always the complete text.
     """
+    global _turn_on_token
+    pending_before = state.get("pending_clarification")
+    _turn_on_token = on_token
+    try:
+        response, new_state = _agent_turn(user_message, state)
+    finally:
+        _turn_on_token = None
+    
+    # A confirmation that was answered, replaced or dropped this turn no longer
+    # needs its prefetch; a later research of that name must fetch fresh
+    if pending_before is not None and pending_before.company:
+        pending_after = new_state.get("pending_clarification")
+        if pending_after is None or pending_after.company != pending_before.company:
+            _cancel_prefetch(pending_before.company)
+    
+    return response, new_state
+
+
+def _agent_turn(user_message: str, state: Dict) -> Tuple[str, Dict]:
+    """One agent turn; see agent()."""
     # Clean input
     user_message = clean_text(user_message)
     
@@ -785,33 +1304,35 @@ def agent(user_message: str, state: Dict) -> Tuple[str, Dict]:
     
     # Add user message to history
     add_message(state, "user", user_message)
-    
-    # Detect user signals for persona adaptation
-    if detect_confusion_signals(user_message):
-        update_persona_signals(state, "confusion_count")
-    if detect_efficiency_signals(user_message):
+    # Recent-context string is memoized per turn; history just changed
+    _turn_context_cache.clear()
+    
+    # Detect user signals for persona adaptation (one pass over the message)
+    flags = detect_user_signals(user_message)
+    
+    # Hesitation ("um", "uh") already matches the confusion patterns, so it
+    # counts once; a question mark is a separate hint
+    confusion_hits = int(flags.confusion or flags.hesitation) + ('?' in user_message)
+    if confusion_hits:
+        update_persona_signals(state, "confusion_count", delta=confusion_hits)
+    if flags.efficiency:
         update_persona_signals(state, "direct_requests")
     
-    # Detect hesitant/uncertain language as confusion signal
-    msg_lower = user_message.lower()
-    if re.search(r'^(um+|uh+|er+|ah+|hmm+)', msg_lower) or '?' in user_message:
-        update_persona_signals(state, "confusion_count")
-    
     # PRIORITY 2: Detect intent
     intent = detect_intent(user_message)
     
     # PRIORITY 1: Handle pending clarifications (confirmation, disambiguation)
     # This must be run before the standard intent handlers to process "yes"/"no"/"1"
     phase = state.get("phase")
-    if phase == ConversationPhase.CLARIFYING.value:
+    if phase == _PHASE_CLARIFYING:
         pending = state.get("pending_clarification")
         if pending:
             # Check if it's a confirmation/selection response
-            if intent in {"confirmation", "selection"} or pending.get("type") == "company_disambiguation":
+            if intent in {"confirmation", "selection"} or pending.kind == "company_disambiguation":
                 
                 was_handled, response, new_state = handle_confirmation_response(user_message, state)
                 if was_handled:
-                    persona = new_state.get("detected_persona", UserPersona.UNKNOWN.value)
+                    persona = new_state.get("detected_persona", _PERSONA_UNKNOWN)
                     response = adapt_response(response, persona, new_state)
                     #response = wrap_text(response, width=76)
                     add_message(new_state, "assistant", response)
@@ -819,7 +1340,7 @@ def agent(user_message: str, state: Dict) -> Tuple[str, Dict]:
                 
                 was_handled, response, new_state = handle_disambiguation_response(user_message, state)
                 if was_handled:
-                    persona = new_state.get("detected_persona", UserPersona.UNKNOWN.value)
+                    persona = new_state.get("detected_persona", _PERSONA_UNKNOWN)
                     response = adapt_response(response, persona, new_state)
                     #response = wrap_text(response, width=76)
                     add_message(new_state, "assistant", response)
@@ -832,115 +1353,16 @@ def agent(user_message: str, state: Dict) -> Tuple[str, Dict]:
         return handle_unclear(user_message, state)
     
     # Standard intent handlers
-    handlers = {
-        "greeting": lambda: handle_greeting(state),
-        "farewell": lambda: handle_farewell(state),
-        "help": lambda: handle_help_request(state),
-        "view_plan": lambda: handle_view_plan(state),
-        "update": lambda: handle_update_request(user_message, state),
-        # Intent 'research' and 'potential_research' now both map to the same logic:
-        "research": lambda: handle_potential_research(user_message, state), 
-        "potential_research": lambda: handle_potential_research(user_message, state),
-        "off_topic": lambda: handle_off_topic(user_message, state),
-        "unclear": lambda: handle_unclear(user_message, state)
-    }
-    
-    handler = handlers.get(intent, handlers["unclear"])
+    handler = _INTENT_HANDLERS.get(intent, handle_unclear)
     
     # FIX: Ensure all handlers return (response, state)
-    response, new_state = handler()
+    response, new_state = handler(user_message, state)
     
     # Adapt response based on persona
-    persona = new_state.get("detected_persona", UserPersona.UNKNOWN.value)
+    persona = new_state.get("detected_persona", _PERSONA_UNKNOWN)
     response = adapt_response(response, persona, new_state)
     #response = wrap_text(response, width=76)
     # Add agent response to history
     add_message(new_state, "assistant", response)
     
     return response, new_state
-
-
-def handle_potential_research(user_message: str, state: Dict) -> Tuple[str, Dict]:
-    """
-    Unified function to extract company names, check for confirmation needs (alias/fuzzy match), 
-    and then either enter clarification phase or proceed to research execution.
-    """
-    msg_lower = user_message.lower().strip()
-    
-    # CRITICAL FIX: If the message contains explicit confusion signals, route to handle_unclear
-    if detect_confusion_signals(user_message):
-        return handle_unclear(user_message, state)
-    
-    # Strip filler words to check underlying intent
-    msg_stripped = re.sub(r'^(um+|uh+|er+|ah+|hmm+)[,\s]*', '', msg_lower).strip()
-    
-    # Don't treat common non-company words as companies
-    is_non_company = msg_lower in NON_COMPANY_WORDS or msg_stripped in NON_COMPANY_WORDS or \
-                     msg_lower in CONFIRMATION_WORDS | GREETING_WORDS | FAREWELL_WORDS
-    
-    if is_non_company:
-        return handle_unclear(user_message, state)
-    
-    # IMPROVEMENT: Pre-clean the message to remove 'research' command words
-    search_terms = re.sub(
-        r'^(research|look up|find|analyze|tell me about|information on|learn about)\s+', 
-        '', 
-        user_message.lower(), 
-        count=1
-    ).strip()
-    
-    # Use LLM-based extraction (where the alias check happens)
-    context = "\n".join([m.get("content", "") for m in get_recent_context(state, 3)])
-    extraction = extract_company_with_llm(search_terms, context)
-    
-    if extraction.get("is_company_query") and extraction.get("extracted_company"):
-        
-        is_alias = extraction.get("is_alias_match", False)
-        
-        # Check if we need confirmation for misspellings, low confidence, OR ALIAS MATCH
-        if needs_confirmation(extraction) or is_alias:
-            
-            # Pass alias info to state for a cleaner flow
-            state["pending_clarification"] = {
-                "type": "company_confirmation",
-                "company": extraction["extracted_company"],
-                "original_input": user_message,
-                "confidence": extraction.get("confidence", 0),
-                "is_alias": is_alias # Flag set here for alias match
-            }
-            set_phase(state, ConversationPhase.CLARIFYING)
-            return format_confirmation_message(extraction), state
-        
-        # If confidence is high AND no clarification needed, proceed directly to execution
-        return handle_direct_research(extraction["extracted_company"], state)
-    
-    # Try fuzzy matching as fallback (only for non-research commands)
-    if not user_message.lower().startswith("research"):
-        fuzzy_result = fuzzy_match_company(user_message, threshold=75)
-        if fuzzy_result:
-            matched, score = fuzzy_result
-            if score >= 85:
-                return handle_direct_research(matched, state)
-            else:
-                # Ask for confirmation
-                state["pending_clarification"] = {
-                    "type": "company_confirmation",
-                    "company": matched,
-                    "original_input": user_message,
-                    "confidence": score / 100.0,
-                    "is_alias": False 
-                }
-                set_phase(state, ConversationPhase.CLARIFYING)
-                return (
-                    f"Did you mean **{matched}**?\n"
-                    "Please reply 'yes' to confirm or provide the correct company name.",
-                    state
-                )
-
-    # Not recognized as a company
-    # Final Fallback: If it's more than one word, assume it's a non-mock company name and research it (low confidence expected)
-    if len(user_message.split()) > 1 and len(user_message) > 5 and not is_non_company:
-        return handle_direct_research(user_message, state)
-    
-    # Truly unclear/single word input that wasn't matched
-    return handle_unclear(user_message, state)
\ No newline at end of file
@@ -16,16 +16,21 @@ Environment Variables:
 import os
 import sys
 import signal
+import threading
 from datetime import datetime
 from dotenv import load_dotenv
 
+# Load environment variables before the local modules build their API clients;
+# load_dotenv never overrides variables that are already exported
+load_dotenv()
+
 # Import local modules
 from state import create_initial_state, get_state_summary, ConversationPhase
 from agent_logic import agent
-from utils import print_welcome, print_help, print_separator, clean_text
-
-# Load environment variables
-load_dotenv()
+from research_cache import research_cache
+from research_tools import set_http_cache_enabled
+from company_normalizer import prime_extraction_cache
+from utils import print_welcome, print_help, print_separator, clean_text, detect_intent
 
 
 # ============================================
@@ -35,9 +40,10 @@ load_dotenv()
 class Config:
     """Application configuration."""
     DEBUG = os.getenv("DEBUG", "false").lower() == "true"
+    NO_CACHE = "--no-cache" in sys.argv[1:]
     MAX_MESSAGE_LENGTH = 2000
-    EXIT_COMMANDS = {"exit", "quit", "bye", "goodbye", "q"}
-    HELP_COMMANDS = {"help", "?", "h"}
+    EXIT_COMMANDS = frozenset({"exit", "quit", "bye", "goodbye", "q"})
+    HELP_COMMANDS = frozenset({"help", "?", "h"})
 
 
 # ============================================
@@ -48,8 +54,17 @@ class CLIInterface:
     """Command-line interface for the Research Assistant."""
     
     def __init__(self):
+        research_cache.enabled = not Config.NO_CACHE
+        set_http_cache_enabled(not Config.NO_CACHE)
         self.state = create_initial_state()
         self.running = True
+        self.interrupted = False
+        self.scripted_input = None
+        # Background extraction batch for scripted input; set the event to cancel it
+        self._priming = None
+        self._stop_priming = threading.Event()
+        # Tokens of the current reply already printed by stream_token
+        self._streamed = []
         self.setup_signal_handlers()
     
     def setup_signal_handlers(self):
@@ -58,10 +73,11 @@ class CLIInterface:
         signal.signal(signal.SIGTERM, self.handle_interrupt)
     
     def handle_interrupt(self, signum, frame):
-        """Handle interrupt signals gracefully."""
-        print("\n\n👋 Session interrupted. Goodbye!")
+        """Stop the chat loop; run() prints the farewell once it unwinds."""
         self.running = False
-        sys.exit(0)
+        self.interrupted = True
+        # Unblocks input() or an in-flight agent call without touching stdio here
+        raise KeyboardInterrupt
     
     def validate_environment(self) -> bool:
         """Validate required environment variables."""
@@ -77,7 +93,10 @@ class CLIInterface:
         """Get and validate user input."""
         try:
             print("You: ", end="")
-            user_input = input().strip()
+            if self.scripted_input is not None:
+                user_input = next(self.scripted_input).strip()
+            else:
+                user_input = input().strip()
             
             # Validate input length
             if len(user_input) > Config.MAX_MESSAGE_LENGTH:
@@ -86,17 +105,40 @@ class CLIInterface:
             
             return user_input
             
-        except EOFError:
+        except (EOFError, StopIteration):
             # Handle piped input ending
             self.running = False
             return "exit"
         except KeyboardInterrupt:
+            if self.interrupted:
+                return ""
             print("\n")
             return "exit"
     
-    def should_exit(self, user_input: str) -> bool:
-        """Check if user wants to exit."""
-        return clean_text(user_input).lower() in Config.EXIT_COMMANDS
+    def load_scripted_input(self):
+        """
+        Read piped stdin up front so its company lookups can share one LLM
+        batch. The batch runs in the background; turns it hasn't answered
+        yet just extract as usual. Reading ahead means the first turn waits
+        for the pipe to close, so this is only done for non-tty input.
+        """
+        lines = sys.stdin.read().splitlines()
+        self.scripted_input = iter(lines)
+        research_lines = [
+            line.strip() for line in lines
+            if line.strip() and detect_intent(line) in ("research", "potential_research")
+        ]
+        if research_lines:
+            self._priming = threading.Thread(
+                target=prime_extraction_cache, args=(research_lines, self._stop_priming), daemon=True
+            )
+            self._priming.start()
+    
+    def stop_priming(self):
+        """Cancel an unfinished priming batch so it isn't left running after exit."""
+        if self._priming is not None and self._priming.is_alive():
+            self._stop_priming.set()
+            self._priming.join(timeout=5)
     
     def show_debug_info(self):
         """Show debug information if enabled."""
@@ -111,6 +153,28 @@ class CLIInterface:
         """Display agent response with formatting."""
         print(f"\n🤖 Assistant: {response}\n")
     
+    def stream_token(self, token: str):
+        """Print a reply token as soon as the agent streams it."""
+        if not token:
+            return
+        if not self._streamed:
+            print("\n🤖 Assistant: ", end="")
+        self._streamed.append(token)
+        print(token, end="", flush=True)
+    
+    def finish_response(self, response: str):
+        """Display the final response, printing only what streaming didn't already show."""
+        streamed = "".join(self._streamed)
+        self._streamed = []
+        if not streamed:
+            self.display_response(response)
+        elif response.startswith(streamed):
+            # e.g. a closing line adapt_response appended after the LLM text
+            print(f"{response[len(streamed):]}\n")
+        else:
+            print()
+            self.display_response(response)
+    
     def run(self):
         """Main chat loop."""
         
@@ -118,6 +182,10 @@ class CLIInterface:
         if not self.validate_environment():
             sys.exit(1)
         
+        # Non-interactive runs (e.g. a file of queries piped in) are read ahead
+        if not sys.stdin.isatty():
+            self.load_scripted_input()
+        
         # Display welcome message
         print_welcome()
         
@@ -129,7 +197,20 @@ class CLIInterface:
     )
 
         
-        # Main conversation loop
+        try:
+            self.chat_loop()
+        except KeyboardInterrupt:
+            self.running = False
+        
+        self.stop_priming()
+        
+        if self.interrupted:
+            print("\n\n👋 Session interrupted. Goodbye!")
+        else:
+            print("\nThank you for using Company Research Assistant! 👋\n")
+    
+    def chat_loop(self):
+        """Read, dispatch and display turns until the user leaves."""
         while self.running:
             # Get user input
             user_input = self.get_user_input()
@@ -137,34 +218,38 @@ class CLIInterface:
             if not user_input:
                 continue
             
+            command = clean_text(user_input).lower()
+            
             # Check for exit
-            if self.should_exit(user_input):
+            if command in Config.EXIT_COMMANDS:
                 farewell_response, self.state = agent("goodbye", self.state)
                 self.display_response(farewell_response)
                 self.running = False
                 break
             
             # Check for quick help
-            if clean_text(user_input).lower() in Config.HELP_COMMANDS:
+            if command in Config.HELP_COMMANDS:
                 print_help()
                 continue
             
             # Process through agent
             try:
-                response, self.state = agent(user_input, self.state)
-                self.display_response(response)
+                self._streamed = []
+                response, self.state = agent(user_input, self.state, on_token=self.stream_token)
+                self.finish_response(response)
                 
                 # Show debug info if enabled
                 self.show_debug_info()
                 
             except Exception as e:
+                if self._streamed:
+                    self._streamed = []
+                    print()
                 print(f"\n❌ An error occurred: Unable to fetch data. Recheck company name.")
                 if Config.DEBUG:
                     import traceback
                     traceback.print_exc()
                 print("Please try again or type 'help' for assistance.\n")
-        
-        print("\nThank you for using Company Research Assistant! 👋\n")
 
 
 # ============================================
@@ -181,6 +266,7 @@ Company Research Assistant - CLI
 
 Usage:
     python app.py                           Run interactive chat
+    python app.py --no-cache                Always fetch fresh research data
     python app.py --help                    Show this help
 
 Environment:
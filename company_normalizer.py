@@ -4,14 +4,21 @@ company_normalizer.py - LLM-based Company Name Normalization
 """
 
 import os
-import json
 import re
-from typing import Dict, Optional, Tuple, List
+import hashlib
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from itertools import islice
+from typing import Dict, Optional, Sequence, Tuple, List
 from groq import Groq
-from dotenv import load_dotenv
 from rapidfuzz import fuzz, process
+from rapidfuzz.utils import default_process
+
+from llm_batch import run_chat_batch
+from utils import json_loads
+
 
-load_dotenv()
 # ============================================
 # CLEAN COMMAND PREFIXES (fix for "Research XyzCo")
 # ============================================
@@ -22,13 +29,15 @@ COMMAND_PREFIXES = [
     "tell me about", "get info on", "get information on"
 ]
 
+# Longest first so "get information on" wins over shorter overlapping prefixes
+_PREFIX_RE = re.compile(
+    r'^\s*(?:' + '|'.join(sorted(map(re.escape, COMMAND_PREFIXES), key=len, reverse=True)) + r')\b\s*',
+    re.IGNORECASE
+)
+
 def clean_input(text: str) -> str:
     """Strip command verbs like 'Research Apple' → 'Apple'"""
-    lower = text.lower().strip()
-    for prefix in COMMAND_PREFIXES:
-        if lower.startswith(prefix):
-            return text[len(prefix):].strip()
-    return text
+    return _PREFIX_RE.sub('', text, count=1).strip()
 
 
 # Initialize Groq client
@@ -36,6 +45,9 @@ client = Groq(api_key=os.getenv("GROQ_API_KEY"))
 MODEL = "llama-3.1-8b-instant"
  # FIX: Model name updated
 
+# Batch API jobs only pay off with a few requests and can take minutes
+BATCH_MIN_JOBS = 5
+
 # ============================================
 # KNOWN COMPANIES DATABASE (for fuzzy matching)
 # ============================================
@@ -59,6 +71,33 @@ KNOWN_COMPANIES = [
     "Flipkart", "Zomato", "Swiggy", "Ola", "Paytm", "PhonePe", "Razorpay"
 ]
 
+# Lowercase name -> canonical name, so exact matches are one dict lookup
+_KNOWN_LOWER = {company.lower(): company for company in KNOWN_COMPANIES}
+
+# Choices normalized once for rapidfuzz; the query gets the same treatment per call
+_KNOWN_PROCESSED = [default_process(company) for company in KNOWN_COMPANIES]
+
+# Known names as whole words, longest first; single letters like "X" are too noisy
+_KNOWN_ALTERNATION = '|'.join(sorted((re.escape(name) for name in _KNOWN_LOWER if len(name) > 1), key=len, reverse=True))
+_KNOWN_WORD_RE = re.compile(r'\b(?:' + _KNOWN_ALTERNATION + r')\b')
+
+# A known name ending a research request ("can you research apple", "info on
+# the company tesla"); "apple pie" or "amazon river" leave the name mid-message
+_KNOWN_REQUEST_RE = re.compile(
+    r'\b(?:research|find|look ?up|search|analy[sz]e|investigate|about|on|for)\s+'
+    r'(?:the\s+)?(?:company\s+)?(' + _KNOWN_ALTERNATION + r')'
+    r'(?:\s+(?:inc|corp|corporation|company|ltd))?[\s.?!]*$'
+)
+
+# Fuzzy scores at or above this are answered without calling the LLM
+FUZZY_BYPASS_THRESHOLD = 75
+
+# Scores from here up to the bypass threshold are only trusted when the
+# whole query also resembles the name (plain ratio, which penalizes length
+# mismatch); WRatio's partial scoring alone lets "skip" match "HP"
+FUZZY_CONFIRM_THRESHOLD = 60
+FUZZY_LENGTH_RATIO_THRESHOLD = 70
+
 # Company aliases and common references
 COMPANY_ALIASES = {
     "the search company": "Google",
@@ -99,8 +138,11 @@ COMPANY_ALIASES = {
     "the music streaming": "Spotify",
 }
 
+# All aliases in one alternation (longest first) so a message is scanned once
+_ALIAS_RE = re.compile('|'.join(sorted(map(re.escape, COMPANY_ALIASES), key=len, reverse=True)))
+
 # Words that should NEVER be treated as company names
-NON_COMPANY_WORDS = {
+NON_COMPANY_WORDS = frozenset({
     # Confirmation words
     "yes", "no", "ok", "okay", "sure", "proceed", "continue", "go", "go ahead",
     "fine", "alright", "right", "correct", "yep", "yup", "nope", "nah",
@@ -121,42 +163,62 @@ NON_COMPANY_WORDS = {
     "a", "an", "the", "and", "or", "but", "if", "then",
     # Numbers
     "1", "2", "3", "4", "5", "one", "two", "three", "first", "second",
-}
+})
 
 # ============================================
 # FUZZY MATCHING FUNCTIONS
 # ============================================
 
-def fuzzy_match_company(query: str, threshold: int = 70) -> Optional[Tuple[str, int]]:
+def fuzzy_match_company(query: str, threshold: int = 70, query_lower: Optional[str] = None) -> Optional[Tuple[str, int]]:
     """
     Fuzzy match a query against known companies.
-    Returns (matched_company, score) or None.
+    Returns (matched_company, score) or None. Pass query_lower if the caller
+    already has the lowercased, stripped query.
     """
     if not query or len(query) < 2:
         return None
     
-    query_lower = query.lower().strip()
-    
     # Check exact match first
-    for company in KNOWN_COMPANIES:
-        if company.lower() == query_lower:
-            return (company, 100)
+    known = _KNOWN_LOWER.get(query.lower().strip() if query_lower is None else query_lower)
+    if known:
+        return (known, 100)
     
     # Fuzzy match against known companies
+    return _fuzzy_extract(query, threshold)
+
+
+@lru_cache(maxsize=4096)
+def _fuzzy_extract(query: str, threshold: int) -> Optional[Tuple[str, int]]:
+    """WRatio best match over KNOWN_COMPANIES, memoized since the list is static."""
     result = process.extractOne(
-        query, 
-        KNOWN_COMPANIES, 
+        default_process(query), 
+        _KNOWN_PROCESSED, 
         scorer=fuzz.WRatio,
+        processor=None,
         score_cutoff=threshold
     )
     
     if result:
-        matched, score, _ = result
-        return (matched, int(score))
+        _, score, index = result
+        return (KNOWN_COMPANIES[index], int(score))
     
     return None
 
 
+def match_known_company(query: str) -> Optional[str]:
+    """Return the canonical known company name if query is exactly one (any case)."""
+    return _KNOWN_LOWER.get(query.lower().strip())
+
+
+def match_company_alias(text: str) -> Optional[Tuple[str, str]]:
+    """Return (alias, company) for the first alias mentioned in text, or None."""
+    match = _ALIAS_RE.search(text.lower())
+    if match:
+        alias = match.group(0)
+        return alias, COMPANY_ALIASES[alias]
+    return None
+
+
 def is_likely_misspelling(query: str) -> bool:
     """
     Check if query looks like a misspelled company name.
@@ -166,7 +228,7 @@ def is_likely_misspelling(query: str) -> bool:
     # Short single words that look like they could be misspellings
     if len(query_lower) >= 4 and len(query_lower) <= 15:
         # Check if it's close to any known company
-        result = fuzzy_match_company(query_lower, threshold=60)
+        result = fuzzy_match_company(query_lower, threshold=60, query_lower=query_lower)
         if result and result[1] >= 60 and result[1] < 100:
             return True
     
@@ -208,14 +270,8 @@ Examples:
 - "Research Apple" → {{"is_company_query": true, "extracted_company": "Apple", "corrected_from": null, "confidence": 1.0, "reasoning": "Direct company mention"}}
 """
 
-def extract_company_with_llm(user_message: str, context: str = "") -> Dict:
-    """
-    Use LLM to extract and normalize company name from user input.
-    Returns dict with: is_company_query, extracted_company, confidence, etc.
-    """
-    # Quick pre-checks for obvious non-company inputs
-    user_message = clean_input(user_message)
-
+def _extract_without_llm(user_message: str) -> Optional[Dict]:
+    """Answer an extraction from word lists, aliases and fuzzy matching, or return None."""
     msg_lower = user_message.lower().strip()
     
     # Check against non-company words
@@ -242,19 +298,40 @@ def extract_company_with_llm(user_message: str, context: str = "") -> Dict:
     
     # === FIX: Prioritize explicit aliases and flag for confirmation ===
     # Check aliases
-    for alias, company in COMPANY_ALIASES.items():
-        if alias in msg_lower:
+    alias_match = match_company_alias(msg_lower)
+    if alias_match:
+        alias, company = alias_match
+        return {
+            "is_company_query": True,
+            "extracted_company": company,
+            "corrected_from": alias, # Using alias as the 'corrected_from' source
+            "confidence": 0.65, # Set confidence below 0.9 to force confirmation
+            "reasoning": f"Matched contextual alias '{alias}' to {company}",
+            "is_alias_match": True # NEW: Added flag
+        }
+    
+    # Exact names come back from the fuzzy matcher at 100
+    fuzzy_result = fuzzy_match_company(user_message, threshold=FUZZY_CONFIRM_THRESHOLD, query_lower=msg_lower)
+    if fuzzy_result and fuzzy_result[1] < FUZZY_BYPASS_THRESHOLD:
+        if fuzz.ratio(default_process(user_message), default_process(fuzzy_result[0])) < FUZZY_LENGTH_RATIO_THRESHOLD:
+            fuzzy_result = None
+    
+    # A known company named at the end of a longer research request
+    if not fuzzy_result or fuzzy_result[1] < 100:
+        request_match = _KNOWN_REQUEST_RE.search(msg_lower)
+        if request_match:
+            company = _KNOWN_LOWER[request_match.group(1)]
             return {
                 "is_company_query": True,
                 "extracted_company": company,
-                "corrected_from": alias, # Using alias as the 'corrected_from' source
-                "confidence": 0.65, # Set confidence below 0.9 to force confirmation
-                "reasoning": f"Matched contextual alias '{alias}' to {company}",
-                "is_alias_match": True # NEW: Added flag
+                "corrected_from": None,
+                "confidence": 0.95,
+                "reasoning": f"Found known company name '{company}' in a research request",
+                "is_alias_match": False
             }
     
-    # Try fuzzy matching next (faster than LLM)
-    fuzzy_result = fuzzy_match_company(user_message, threshold=75)
+    # Fuzzy hits that survived the band check skip the LLM; below 85%
+    # confidence needs_confirmation() has the user check the guess
     if fuzzy_result:
         matched, score = fuzzy_result
         return {
@@ -266,45 +343,184 @@ def extract_company_with_llm(user_message: str, context: str = "") -> Dict:
             "is_alias_match": False # NEW: Added flag
         }
     
+    return None
+
+
+def _build_extraction_messages(user_message: str, context: str) -> List[Dict]:
+    prompt = COMPANY_EXTRACTION_PROMPT.format(
+        user_message=user_message,
+        context=context[:500] if context else "No previous context"
+    )
+    return [
+        {"role": "system", "content": "You extract company names from user input. Respond only with valid JSON."},
+        {"role": "user", "content": prompt}
+    ]
+
+
+_CODEFENCE_RE = re.compile(r'```(?:json)?\s*(.*?)\s*```', re.DOTALL)
+
+
+def _parse_extraction(result_text: str) -> Dict:
+    """Parse the model's JSON reply; raises on malformed output."""
+    # Clean up response: keep only the body of a ```json fence if there is one
+    fenced = _CODEFENCE_RE.search(result_text)
+    if fenced:
+        result_text = fenced.group(1)
+    
+    result = json_loads(result_text.strip())
+    result["is_alias_match"] = False # NEW: Add default flag
+    return result
+
+
+def _stream_extraction(messages: List[Dict]) -> Dict:
+    """
+    Stream the extraction reply and return as soon as the first JSON object
+    closes, instead of waiting for any trailing tokens.
+    """
+    stream = client.chat.completions.create(
+        model=MODEL,
+        messages=messages,
+        temperature=0.1,
+        max_tokens=300,
+        stream=True
+    )
+    
+    parts = []
+    depth = 0
+    opened = False
+    try:
+        for chunk in stream:
+            token = chunk.choices[0].delta.content if chunk.choices else None
+            if not token:
+                continue
+            parts.append(token)
+            
+            # Braces inside string values can fool the count; a failed parse just keeps reading
+            if "{" in token:
+                opened = True
+            depth += token.count("{") - token.count("}")
+            if opened and depth <= 0:
+                text = "".join(parts)
+                try:
+                    result = json_loads(text[text.index("{"):text.rindex("}") + 1])
+                except ValueError:
+                    continue
+                result["is_alias_match"] = False # NEW: Add default flag
+                return result
+    finally:
+        stream.close()
+    
+    return _parse_extraction("".join(parts))
+
+
+def _heuristic_extraction(user_message: str, error: Exception) -> Dict:
+    """Fallback when the LLM call or its JSON fails."""
+    return {
+        "is_company_query": len(user_message.split()) <= 3 and user_message[0].isupper(),
+        "extracted_company": user_message if len(user_message.split()) <= 3 else None,
+        "corrected_from": None,
+        "confidence": 0.5,
+        "reasoning": f"LLM extraction failed ({str(error)}), using heuristic",
+        "is_alias_match": False # NEW: Added flag
+    }
+
+
+def extract_company_with_llm(user_message: str, context: str = "") -> Dict:
+    """
+    Use LLM to extract and normalize company name from user input.
+    Returns dict with: is_company_query, extracted_company, confidence, etc.
+    """
+    # Quick pre-checks for obvious non-company inputs
+    user_message = clean_input(user_message)
+    
+    local_result = _extract_without_llm(user_message)
+    if local_result is not None:
+        return local_result
+    
     # Call LLM for complex cases
     try:
-        prompt = COMPANY_EXTRACTION_PROMPT.format(
-            user_message=user_message,
-            context=context[:500] if context else "No previous context"
-        )
-        
-        response = client.chat.completions.create(
-            model=MODEL,
-            messages=[
-                {"role": "system", "content": "You extract company names from user input. Respond only with valid JSON."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.1,
-            max_tokens=300
-        )
-        
-        result_text = response.choices[0].message.content.strip()
-        
-        # Clean up response
-        if "```json" in result_text:
-            result_text = result_text.split("```json")[1].split("```")[0]
-        elif "```" in result_text:
-            result_text = result_text.split("```")[1].split("```")[0]
-        
-        result = json.loads(result_text.strip())
-        result["is_alias_match"] = False # NEW: Add default flag
-        return result
+        return _stream_extraction(_build_extraction_messages(user_message, context))
         
     except Exception as e:
         # Fallback: simple heuristic
-        return {
-            "is_company_query": len(user_message.split()) <= 3 and user_message[0].isupper(),
-            "extracted_company": user_message if len(user_message.split()) <= 3 else None,
-            "corrected_from": None,
-            "confidence": 0.5,
-            "reasoning": f"LLM extraction failed ({str(e)}), using heuristic",
-            "is_alias_match": False # NEW: Added flag
+        return _heuristic_extraction(user_message, e)
+
+
+# ============================================
+# EXTRACTION CACHE
+# ============================================
+
+EXTRACTION_CACHE_SIZE = 512
+
+# LRU of extraction results keyed by (message, hash of the context the prompt sees)
+_EXTRACTION_CACHE: "OrderedDict[Tuple[str, str], Dict]" = OrderedDict()
+
+# Context-free results from prime_extraction_cache, keyed by cleaned message
+_PRIMED_EXTRACTIONS: Dict[str, Dict] = {}
+
+
+def cached_extract_company_with_llm(user_message: str, context: str = "") -> Dict:
+    """
+    Memoized extract_company_with_llm. Repeated inputs in the same recent
+    context skip the LLM round trip; failed LLM calls are not cached.
+    """
+    # Only the first 500 chars of context reach the prompt, so only they matter
+    context_hash = hashlib.sha1((context or "")[:500].encode()).hexdigest()[:16]
+    key = (user_message.strip(), context_hash)
+    
+    cached = _EXTRACTION_CACHE.get(key)
+    if cached is not None:
+        _EXTRACTION_CACHE.move_to_end(key)
+        return dict(cached)
+    
+    result = _PRIMED_EXTRACTIONS.pop(clean_input(user_message), None)
+    if result is None:
+        result = extract_company_with_llm(user_message, context)
+    if not result.get("reasoning", "").startswith("LLM extraction failed"):
+        _EXTRACTION_CACHE[key] = dict(result)
+        if len(_EXTRACTION_CACHE) > EXTRACTION_CACHE_SIZE:
+            _EXTRACTION_CACHE.popitem(last=False)
+    return result
+
+
+def prime_extraction_cache(messages: List[str], stop: Optional[threading.Event] = None) -> None:
+    """
+    Batch-extract scripted input (e.g. piped stdin) alongside the chat loop.
+    Only messages that would reach the LLM and don't lean on conversation
+    context are primed, and only through the Batch API. There is no deadline:
+    results are stored as soon as the batch completes, and turns that come
+    earlier extract normally. Setting stop cancels the batch. Each primed
+    result is used once, by the first cache miss for that message.
+    """
+    pending = []
+    for message in dict.fromkeys(map(clean_input, messages)):
+        if any(phrase in message.lower() for phrase in _CONTEXTUAL_PHRASES):
+            continue
+        if _extract_without_llm(message) is None:
+            pending.append(message)
+    
+    if len(pending) < BATCH_MIN_JOBS:
+        return
+    
+    outputs = run_chat_batch(client, [
+        {
+            "custom_id": str(index),
+            "messages": _build_extraction_messages(message, ""),
+            "temperature": 0.1,
+            "max_tokens": 300
         }
+        for index, message in enumerate(pending)
+    ], MODEL, max_wait=None, stop=stop) or {}
+    
+    for index, message in enumerate(pending):
+        content = outputs.get(str(index))
+        if content is None:
+            continue
+        try:
+            _PRIMED_EXTRACTIONS[message] = _parse_extraction(content)
+        except Exception:
+            continue
+
 
 def needs_confirmation(extraction_result: Dict) -> bool:
     """
@@ -352,33 +568,33 @@ def format_confirmation_message(extraction_result: Dict) -> str:
 # CONTEXT-AWARE RESOLUTION
 # ============================================
 
-def resolve_contextual_reference(message: str, conversation_history: List[Dict]) -> Optional[str]:
+_CONTEXTUAL_PHRASES = (
+    "that company", "this company", "the company", "the one",
+    "that one", "this one", "same company", "same one",
+    "the previous one", "the last one", "mentioned company"
+)
+
+
+def resolve_contextual_reference(message: str, conversation_history: Sequence[Dict]) -> Optional[str]:
     """
     Resolve contextual references like "that company", "the one you mentioned".
     """
     msg_lower = message.lower().strip()
     
     # Check for contextual phrases
-    contextual_phrases = [
-        "that company", "this company", "the company", "the one",
-        "that one", "this one", "same company", "same one",
-        "the previous one", "the last one", "mentioned company"
-    ]
-    
-    is_contextual = any(phrase in msg_lower for phrase in contextual_phrases)
+    is_contextual = any(phrase in msg_lower for phrase in _CONTEXTUAL_PHRASES)
     
     if not is_contextual:
         return None
     
     # Look for the most recent company mention in history
-    for msg in reversed(conversation_history[-10:]):
-        content = msg.get("content", "")
+    for msg in islice(reversed(conversation_history), 10):
         # Check if assistant mentioned a company
         if msg.get("role") == "assistant":
-            # Look for company names in the response
-            for company in KNOWN_COMPANIES:
-                if company.lower() in content.lower():
-                    return company
+            # One scan of the lowercased response for any known name
+            match = _KNOWN_WORD_RE.search(msg.get("content", "").lower())
+            if match:
+                return _KNOWN_LOWER[match.group(0)]
     
     return None
 
@@ -0,0 +1,121 @@
+"""
+llm_batch.py - Groq Batch API helper
+
+Submits many independent chat completions as one batch job. Batch jobs are
+cheaper than individual calls but can take a while to finish, so callers
+pass a maximum wait (or a stop event) and fall back to regular calls when
+the batch doesn't deliver in time.
+"""
+
+import io
+import json
+import threading
+import time
+from typing import Dict, List, Optional
+
+
+# ============================================
+# CONFIGURATION
+# ============================================
+
+BATCH_ENDPOINT = "/v1/chat/completions"
+BATCH_COMPLETION_WINDOW = "24h"
+POLL_INITIAL_DELAY = 2.0
+POLL_MAX_DELAY = 30.0
+TERMINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
+
+# ============================================
+# BATCH SUBMISSION
+# ============================================
+
+def build_batch_file(requests: List[Dict], model: str) -> bytes:
+    """Encode chat requests as Batch API JSONL.
+
+    Each request needs a "custom_id" and "messages"; "temperature" and
+    "max_tokens" are optional.
+    """
+    lines = []
+    for request in requests:
+        body = {"model": model, "messages": request["messages"]}
+        for key in ("temperature", "max_tokens"):
+            if key in request:
+                body[key] = request[key]
+        lines.append(json.dumps({
+            "custom_id": request["custom_id"],
+            "method": "POST",
+            "url": BATCH_ENDPOINT,
+            "body": body
+        }))
+    return "\n".join(lines).encode()
+
+
+def parse_batch_output(output_text: str) -> Dict[str, str]:
+    """Map custom_id to completion text for every successful batch line."""
+    results = {}
+    for line in output_text.splitlines():
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+            response = record.get("response") or {}
+            if response.get("status_code") != 200:
+                continue
+            results[record["custom_id"]] = response["body"]["choices"][0]["message"]["content"] or ""
+        except (json.JSONDecodeError, KeyError, IndexError, TypeError):
+            continue
+    return results
+
+
+def run_chat_batch(client, requests: List[Dict], model: str, max_wait: Optional[float] = 300.0,
+                   stop: Optional[threading.Event] = None) -> Optional[Dict[str, str]]:
+    """
+    Run chat requests through the Batch API and wait up to max_wait seconds
+    (max_wait=None waits for the batch to settle). Setting stop ends the wait
+    early. Returns {custom_id: content}, or None if the batch failed, timed
+    out or was stopped; an abandoned batch is cancelled so it is not billed.
+    Errors are not printed, since callers may run this in the background.
+    """
+    batch = None
+    try:
+        batch_file = client.files.create(
+            file=("batch.jsonl", io.BytesIO(build_batch_file(requests, model))),
+            purpose="batch"
+        )
+        batch = client.batches.create(
+            completion_window=BATCH_COMPLETION_WINDOW,
+            endpoint=BATCH_ENDPOINT,
+            input_file_id=batch_file.id
+        )
+
+        # Poll with exponential backoff until the job settles or we give up
+        deadline = None if max_wait is None else time.monotonic() + max_wait
+        delay = POLL_INITIAL_DELAY
+        while batch.status not in TERMINAL_STATUSES:
+            wait = delay
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    client.batches.cancel(batch.id)
+                    return None
+                wait = min(delay, remaining)
+            if stop is None:
+                time.sleep(wait)
+            elif stop.wait(wait):
+                client.batches.cancel(batch.id)
+                return None
+            delay = min(delay * 2, POLL_MAX_DELAY)
+            batch = client.batches.retrieve(batch.id)
+
+        if batch.status != "completed" or not batch.output_file_id:
+            return None
+
+        return parse_batch_output(client.files.content(batch.output_file_id).text())
+
+    except Exception:
+        if batch is not None and batch.status not in TERMINAL_STATUSES:
+            try:
+                client.batches.cancel(batch.id)
+            except Exception:
+                pass
+        return None
@@ -0,0 +1,159 @@
+"""
+research_cache.py - Research Result Cache
+
+Two-tier cache for fetch_company_data results: a small in-memory LRU in
+front of pickle files on disk, so re-researching a company within the TTL
+skips Wikipedia entirely, even across restarts.
+"""
+
+import asyncio
+import hashlib
+import os
+import pickle
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+from research_tools import ResearchResult, fetch_company_data, set_miss_cache_enabled
+
+
+# ============================================
+# CONFIGURATION
+# ============================================
+
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "company_research")
+MEMORY_CACHE_SIZE = 128
+DEFAULT_TTL_SECONDS = 86400
+
+# Bump when ResearchResult's layout changes so stale pickles are never loaded
+CACHE_FORMAT_VERSION = 2
+
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+def canonicalize(company_name: str) -> str:
+    """Normalize a company name into a cache key."""
+    return _WHITESPACE_RE.sub(' ', company_name.strip().lower())
+
+
+# ============================================
+# CACHE
+# ============================================
+
+class ResearchCache:
+    """Memory LRU + disk cache of successful ResearchResults."""
+
+    def __init__(self, cache_dir: str = CACHE_DIR, max_entries: int = MEMORY_CACHE_SIZE):
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self._enabled = True
+        self._memory: "OrderedDict[str, Tuple[float, ResearchResult]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self._enabled
+
+    @enabled.setter
+    def enabled(self, enabled: bool) -> None:
+        # research_tools' recent-miss memory is part of "caching" too
+        self._enabled = enabled
+        set_miss_cache_enabled(enabled)
+
+    def _path(self, key: str) -> str:
+        digest = hashlib.sha1(f"v{CACHE_FORMAT_VERSION}:{key}".encode()).hexdigest()
+        return os.path.join(self.cache_dir, digest + ".pkl")
+
+    def _remember(self, key: str, expires_at: float, result: ResearchResult) -> None:
+        with self._lock:
+            self._memory[key] = (expires_at, result)
+            self._memory.move_to_end(key)
+            if len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    def get(self, company_name: str) -> Optional[ResearchResult]:
+        """Return a cached result that has not expired, or None."""
+        if not self.enabled:
+            return None
+
+        key = canonicalize(company_name)
+        now = time.time()
+
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._memory.move_to_end(key)
+                    return entry[1]
+                del self._memory[key]
+
+        # Fall back to disk; any unreadable or stale file is just a miss
+        try:
+            with open(self._path(key), "rb") as f:
+                expires_at, result = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, ValueError, AttributeError):
+            return None
+
+        if expires_at <= now:
+            return None
+
+        self._remember(key, expires_at, result)
+        return result
+
+    def put(self, company_name: str, result: ResearchResult, ttl_seconds: int = DEFAULT_TTL_SECONDS) -> ResearchResult:
+        """Store a successful result and return it unchanged."""
+        if not self.enabled or not result.success:
+            return result
+
+        key = canonicalize(company_name)
+        expires_at = time.time() + ttl_seconds
+        self._remember(key, expires_at, result)
+
+        # Write to a temp file and rename so readers never see a partial pickle
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(tmp_path, "wb") as f:
+                pickle.dump((expires_at, result), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+        except (OSError, pickle.PicklingError):
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+        return result
+
+    def clear(self) -> None:
+        """Drop the in-memory tier (disk entries expire on their own)."""
+        with self._lock:
+            self._memory.clear()
+
+
+research_cache = ResearchCache()
+
+
+def cached_fetch_company_data(company_name: str) -> ResearchResult:
+    """fetch_company_data behind the shared research cache."""
+    cached = research_cache.get(company_name)
+    if cached is not None:
+        return cached
+    return research_cache.put(company_name, fetch_company_data(company_name))
+
+
+# Matches the pooled Wikipedia session's connection budget
+MAX_CONCURRENT_FETCHES = 10
+
+
+async def fetch_companies_data(company_names: List[str]) -> List[ResearchResult]:
+    """Research several companies concurrently, in input order, through the cache."""
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_FETCHES)
+
+    async def fetch_one(company_name: str) -> ResearchResult:
+        async with semaphore:
+            return await asyncio.to_thread(cached_fetch_company_data, company_name)
+
+    return await asyncio.gather(*(fetch_one(name) for name in company_names))
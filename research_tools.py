@@ -10,12 +10,28 @@ UPDATED:
 - Cleaner data extraction
 """
 
+import os
 import requests
 import re
+import threading
+import time
+from collections import OrderedDict
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from dataclasses import dataclass
+from functools import lru_cache
+from itertools import islice
 from typing import Dict, List, Optional, Tuple, Any
 
 from rapidfuzz import process, fuzz
+
+from utils import STOP_WORDS
+
+try:
+    import requests_cache
+except ImportError:  # requests-cache is optional; fall back to an uncached session
+    requests_cache = None
+
 COMPANY_INDICATORS = [
     "company", "corporation", "inc.", "inc ", "llc",
     "ltd", "plc", "subsidiary", "multinational",
@@ -35,7 +51,7 @@ NON_COMPANY_TYPES = [
 ]
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ResearchResult:
     """Structured research result."""
     success: bool
@@ -52,7 +68,6 @@ class ResearchResult:
 # WIKIPEDIA API INTEGRATION
 # ============================================
 
-WIKIPEDIA_REST_URL = "https://en.wikipedia.org/api/rest_v1/page/summary/{title}"
 WIKIPEDIA_SEARCH_URL = "https://en.wikipedia.org/w/api.php"
 
 HEADERS = {
@@ -60,9 +75,42 @@ HEADERS = {
     "Accept": "application/json"
 }
 
+# One pooled session so repeated lookups reuse the TCP/TLS connection.
+# With requests-cache installed, GET responses are also kept on disk for a day.
+HTTP_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "company_research", "wikipedia")
+HTTP_CACHE_TTL_SECONDS = 86400
+
+if requests_cache is not None:
+    _SESSION = requests_cache.CachedSession(
+        HTTP_CACHE_PATH,
+        backend="sqlite",
+        expire_after=HTTP_CACHE_TTL_SECONDS,
+        allowable_methods=("GET",),
+        cache_control=True
+    )
+else:
+    _SESSION = requests.Session()
+_SESSION.headers.update(HEADERS)
+_SESSION.mount("https://", HTTPAdapter(
+    pool_connections=10,
+    pool_maxsize=20,
+    max_retries=Retry(total=2, backoff_factor=0.2, status_forcelist=(429, 500, 502, 503, 504))
+))
+
+
+def set_http_cache_enabled(enabled: bool) -> None:
+    """Turn the on-disk HTTP cache on or off (no-op without requests-cache)."""
+    if requests_cache is not None:
+        _SESSION.settings.disabled = not enabled
+
 
 def search_wikipedia(query: str, limit: int = 5) -> List[Dict]:
     """Search Wikipedia using the classic API."""
+    return _search_wikipedia(query, limit) or []
+
+
+def _search_wikipedia(query: str, limit: int = 5) -> Optional[List[Dict]]:
+    """search_wikipedia, but None when the request itself failed."""
     params = {
         "action": "query",
         "list": "search",
@@ -73,7 +121,7 @@ def search_wikipedia(query: str, limit: int = 5) -> List[Dict]:
     }
 
     try:
-        response = requests.get(WIKIPEDIA_SEARCH_URL, params=params, headers=HEADERS, timeout=10)
+        response = _SESSION.get(WIKIPEDIA_SEARCH_URL, params=params, timeout=10)
         response.raise_for_status()
         data = response.json()
 
@@ -88,37 +136,84 @@ def search_wikipedia(query: str, limit: int = 5) -> List[Dict]:
 
     except requests.exceptions.RequestException as e:
         print(f"Wikipedia search error: {e}")
-        return []
+        return None
 
 
-def get_wikipedia_page(title: str) -> Optional[Dict]:
-    """Fetch a clean summary using Wikipedia REST API."""
-    formatted = title.replace(" ", "_")
-    url = WIKIPEDIA_REST_URL.format(title=formatted)
+# prop=extracts with exintro returns at most 20 pages per request
+WIKIPEDIA_EXTRACTS_LIMIT = 20
 
-    try:
-        response = requests.get(url, headers=HEADERS, timeout=10)
-        response.raise_for_status()
-        data = response.json()
 
-        if "extract" in data and data["extract"]:
-            return {
-                "title": data.get("title", title),
-                "extract": data.get("extract", ""),
-                "source": data.get("content_urls", {})
-                         .get("desktop", {})
-                         .get("page", f"https://en.wikipedia.org/wiki/{formatted}")
-            }
-        return None
+def get_wikipedia_pages(titles: List[str]) -> Dict[str, Dict]:
+    """
+    Fetch plain-text intro extracts for several titles in one API request.
+    Returns {requested_title: {"title", "extract", "source"}} for the titles
+    that resolved to a page with a non-empty extract.
+    """
+    return _get_wikipedia_pages(titles)[0]
+
+
+def _get_wikipedia_pages(titles: List[str]) -> Tuple[Dict[str, Dict], bool]:
+    """get_wikipedia_pages plus whether any request failed along the way."""
+    pages = {}
+    failed = False
+
+    for start in range(0, len(titles), WIKIPEDIA_EXTRACTS_LIMIT):
+        chunk = titles[start:start + WIKIPEDIA_EXTRACTS_LIMIT]
+        params = {
+            "action": "query",
+            "prop": "extracts|info",
+            "exintro": 1,
+            "explaintext": 1,
+            "exlimit": "max",
+            "inprop": "url",
+            "redirects": 1,
+            "titles": "|".join(chunk),
+            "format": "json",
+            "formatversion": 2
+        }
+
+        try:
+            response = _SESSION.get(WIKIPEDIA_SEARCH_URL, params=params, timeout=10)
+            response.raise_for_status()
+            query = response.json().get("query", {})
+        except (requests.exceptions.RequestException, ValueError) as e:
+            print(f"Wikipedia fetch error: {e}")
+            failed = True
+            continue
+
+        # Follow title normalization and redirects back to what the caller asked for
+        resolved = {item["from"]: item["to"] for item in query.get("normalized", [])}
+        redirects = {item["from"]: item["to"] for item in query.get("redirects", [])}
+        by_title = {page.get("title"): page for page in query.get("pages", [])}
+
+        for title in chunk:
+            final = resolved.get(title, title)
+            final = redirects.get(final, final)
+            page = by_title.get(final)
+            if page and page.get("extract"):
+                pages[title] = {
+                    "title": page["title"],
+                    "extract": page["extract"],
+                    "source": page.get("fullurl", f"https://en.wikipedia.org/wiki/{final.replace(' ', '_')}")
+                }
+
+    return pages, failed
+
+
+def get_wikipedia_page(title: str) -> Optional[Dict]:
+    """Fetch a clean summary for a single title."""
+    return get_wikipedia_pages([title]).get(title)
 
-    except requests.exceptions.RequestException as e:
-        print(f"Wikipedia fetch error: {e}")
-        return None
+
+_TAG_RE = re.compile(r'<[^>]+>')
 
 
 def clean_html(text: str) -> str:
     """Remove HTML tags from text."""
-    return re.sub(r'<[^>]+>', '', text)
+    # Search snippets only carry a few <span class="searchmatch"> tags
+    if '<' not in text:
+        return text
+    return _TAG_RE.sub('', text)
 
 
 # ============================================
@@ -147,17 +242,60 @@ def fuzzy_pick_best_match(user_query: str, search_results: List[Dict]) -> Option
 # DATA EXTRACTION
 # ============================================
 
+# Any non-company type as a substring, found in one scan (endpos bounds it to the lead)
+_NON_COMPANY_TYPES_RE = re.compile('|'.join(map(re.escape, NON_COMPANY_TYPES)))
+
+_FIELD_PATTERNS = {
+    field: tuple(re.compile(p, re.IGNORECASE) for p in field_patterns)
+    for field, field_patterns in {
+        "founded": [
+            r"founded\s+(?:in\s+)?(\d{4})",
+            r"established\s+(?:in\s+)?(\d{4})",
+            r"incorporated\s+(?:in\s+)?(\d{4})"
+        ],
+        "headquarters": [
+            r"headquartered\s+in\s+([A-Z][a-zA-Z\s,]+?)(?:\.|,|and)",
+            r"headquarters\s+(?:is\s+)?(?:in\s+)?([A-Z][a-zA-Z\s,]+?)(?:\.|,|and)",
+            r"based\s+in\s+([A-Z][a-zA-Z\s,]+?)(?:\.|,|and)"
+        ],
+        "industry": [
+            r"(?:is\s+a[n]?\s+)([A-Za-z\s]+?)\s+company",
+            r"(?:is\s+a[n]?\s+)([A-Za-z\s]+?)\s+corporation",
+            r"(?:in\s+the\s+)([A-Za-z\s]+?)\s+(?:industry|sector)"
+        ],
+        "revenue": [
+            r"revenue\s+(?:of\s+)?(?:US)?\$?([\d.,]+\s*(?:billion|million|trillion))",
+            r"(?:US)?\$?([\d.,]+\s*(?:billion|million|trillion))\s+(?:in\s+)?revenue"
+        ],
+        "employees": [
+            r"([\d,]+)\s+employees",
+            r"employs?\s+([\d,]+)\s+(?:people|workers|staff)"
+        ]
+    }.items()
+}
+
+_PRODUCT_SPLIT_RE = re.compile(r'[,;]|\band\b')
+
+# Matched against the lowercased text, so no IGNORECASE needed
+_PRODUCT_PATTERNS = (
+    re.compile(r"products?\s+(?:include|such as|like)\s+([^.]+)"),
+    re.compile(r"(?:known for|famous for)\s+([^.]+)"),
+    re.compile(r"services?\s+(?:include|such as|like)\s+([^.]+)")
+)
+
+
 def extract_company_info(wiki_text: str, company_name: str) -> Dict:
     """Extract structured company information from Wikipedia text."""
     # Validate that this is actually a company page
-    lower = wiki_text.lower()
+    text_lower = wiki_text.lower()
 
 # Reject if it clearly describes a non-company entity
-    if any(term in lower[:300] for term in NON_COMPANY_TYPES):
+    if _NON_COMPANY_TYPES_RE.search(text_lower, 0, 300):
         return {}
 
 # Accept only if strong company indicators exist
-    indicator_hits = sum(1 for term in COMPANY_INDICATORS if term in lower[:400])
+    head = text_lower[:400]
+    indicator_hits = sum(1 for term in COMPANY_INDICATORS if term in head)
 
     if indicator_hits < 2:
         return {}   # Not enough evidence it's a company
@@ -180,51 +318,19 @@ def extract_company_info(wiki_text: str, company_name: str) -> Dict:
 
     info["description"] = wiki_text[:1500]
 
-    patterns = {
-        "founded": [
-            r"founded\s+(?:in\s+)?(\d{4})",
-            r"established\s+(?:in\s+)?(\d{4})",
-            r"incorporated\s+(?:in\s+)?(\d{4})"
-        ],
-        "headquarters": [
-            r"headquartered\s+in\s+([A-Z][a-zA-Z\s,]+?)(?:\.|,|and)",
-            r"headquarters\s+(?:is\s+)?(?:in\s+)?([A-Z][a-zA-Z\s,]+?)(?:\.|,|and)",
-            r"based\s+in\s+([A-Z][a-zA-Z\s,]+?)(?:\.|,|and)"
-        ],
-        "industry": [
-            r"(?:is\s+a[n]?\s+)([A-Za-z\s]+?)\s+company",
-            r"(?:is\s+a[n]?\s+)([A-Za-z\s]+?)\s+corporation",
-            r"(?:in\s+the\s+)([A-Za-z\s]+?)\s+(?:industry|sector)"
-        ],
-        "revenue": [
-            r"revenue\s+(?:of\s+)?(?:US)?\$?([\d.,]+\s*(?:billion|million|trillion))",
-            r"(?:US)?\$?([\d.,]+\s*(?:billion|million|trillion))\s+(?:in\s+)?revenue"
-        ],
-        "employees": [
-            r"([\d,]+)\s+employees",
-            r"employs?\s+([\d,]+)\s+(?:people|workers|staff)"
-        ]
-    }
-
-    text_lower = wiki_text.lower()
-
-    for field, field_patterns in patterns.items():
+    for field, field_patterns in _FIELD_PATTERNS.items():
         for pattern in field_patterns:
-            match = re.search(pattern, wiki_text if field == "headquarters" else text_lower, re.IGNORECASE)
+            match = pattern.search(wiki_text if field == "headquarters" else text_lower)
             if match:
                 info[field] = match.group(1).strip()
                 break
 
-    product_patterns = [
-        r"products?\s+(?:include|such as|like)\s+([^.]+)",
-        r"(?:known for|famous for)\s+([^.]+)",
-        r"services?\s+(?:include|such as|like)\s+([^.]+)"
-    ]
-    for pattern in product_patterns:
-        match = re.search(pattern, text_lower)
+    for pattern in _PRODUCT_PATTERNS:
+        match = pattern.search(text_lower)
         if match:
             products_text = match.group(1)
-            info["products"] = [p.strip() for p in re.split(r'[,;]|\band\b', products_text) if p.strip()][:10]
+            stripped = (p.strip() for p in _PRODUCT_SPLIT_RE.split(products_text))
+            info["products"] = list(islice((p for p in stripped if p), 10))
             break
 
     return info
@@ -273,10 +379,10 @@ MOCK_COMPANY_DATA = {
         "industry": "Technology, Consumer Electronics",
         "founded": "1976",
         "headquarters": "Cupertino, California, USA",
-        "products": ["iPhone", "iPad", "Mac", "Apple Watch", "AirPods", "Apple TV"],
-        "services": ["App Store", "Apple Music", "iCloud", "Apple TV+", "Apple Pay"],
-        "competitors": ["Samsung", "Google", "Microsoft", "Huawei", "Sony"],
-        "key_people": ["Tim Cook (CEO)", "Craig Federighi (SVP Software Engineering)"],
+        "products": ("iPhone", "iPad", "Mac", "Apple Watch", "AirPods", "Apple TV"),
+        "services": ("App Store", "Apple Music", "iCloud", "Apple TV+", "Apple Pay"),
+        "competitors": ("Samsung", "Google", "Microsoft", "Huawei", "Sony"),
+        "key_people": ("Tim Cook (CEO)", "Craig Federighi (SVP Software Engineering)"),
         "revenue": "$383 billion (2023)",
         "employees": "164,000+"
     },
@@ -286,10 +392,10 @@ MOCK_COMPANY_DATA = {
         "industry": "Technology, Software, Cloud Computing",
         "founded": "1975",
         "headquarters": "Redmond, Washington, USA",
-        "products": ["Windows", "Microsoft 365", "Xbox", "Surface", "Azure"],
-        "services": ["Azure Cloud", "LinkedIn", "GitHub", "Microsoft 365", "Dynamics 365"],
-        "competitors": ["Apple", "Google", "Amazon", "Oracle", "Salesforce"],
-        "key_people": ["Satya Nadella (CEO)", "Brad Smith (President)"],
+        "products": ("Windows", "Microsoft 365", "Xbox", "Surface", "Azure"),
+        "services": ("Azure Cloud", "LinkedIn", "GitHub", "Microsoft 365", "Dynamics 365"),
+        "competitors": ("Apple", "Google", "Amazon", "Oracle", "Salesforce"),
+        "key_people": ("Satya Nadella (CEO)", "Brad Smith (President)"),
         "revenue": "$211 billion (2023)",
         "employees": "221,000+"
     },
@@ -299,10 +405,10 @@ MOCK_COMPANY_DATA = {
         "industry": "Technology, Internet Services, Advertising",
         "founded": "1998",
         "headquarters": "Mountain View, California, USA",
-        "products": ["Google Search", "Chrome", "Android", "Pixel", "Nest"],
-        "services": ["Google Cloud", "YouTube", "Google Maps", "Gmail", "Google Workspace"],
-        "competitors": ["Microsoft", "Apple", "Amazon", "Meta", "OpenAI"],
-        "key_people": ["Sundar Pichai (CEO)"],
+        "products": ("Google Search", "Chrome", "Android", "Pixel", "Nest"),
+        "services": ("Google Cloud", "YouTube", "Google Maps", "Gmail", "Google Workspace"),
+        "competitors": ("Microsoft", "Apple", "Amazon", "Meta", "OpenAI"),
+        "key_people": ("Sundar Pichai (CEO)",),
         "revenue": "$307 billion (2023)",
         "employees": "182,000+"
     },
@@ -312,10 +418,10 @@ MOCK_COMPANY_DATA = {
         "industry": "E-commerce, Cloud Computing, Technology",
         "founded": "1994",
         "headquarters": "Seattle, Washington, USA",
-        "products": ["Kindle", "Echo", "Fire TV", "Ring"],
-        "services": ["Amazon Web Services (AWS)", "Prime Video", "Amazon Prime", "Alexa"],
-        "competitors": ["Walmart", "Microsoft", "Google", "Alibaba", "eBay"],
-        "key_people": ["Andy Jassy (CEO)", "Jeff Bezos (Founder)"],
+        "products": ("Kindle", "Echo", "Fire TV", "Ring"),
+        "services": ("Amazon Web Services (AWS)", "Prime Video", "Amazon Prime", "Alexa"),
+        "competitors": ("Walmart", "Microsoft", "Google", "Alibaba", "eBay"),
+        "key_people": ("Andy Jassy (CEO)", "Jeff Bezos (Founder)"),
         "revenue": "$574 billion (2023)",
         "employees": "1,500,000+"
     },
@@ -325,10 +431,10 @@ MOCK_COMPANY_DATA = {
         "industry": "Automotive, Clean Energy, Technology",
         "founded": "2003",
         "headquarters": "Austin, Texas, USA",
-        "products": ["Model S", "Model 3", "Model X", "Model Y", "Cybertruck", "Powerwall", "Solar Roof"],
-        "services": ["Supercharger Network", "Full Self-Driving", "Tesla Insurance"],
-        "competitors": ["Ford", "GM", "Volkswagen", "Rivian", "BYD", "Lucid Motors"],
-        "key_people": ["Elon Musk (CEO)"],
+        "products": ("Model S", "Model 3", "Model X", "Model Y", "Cybertruck", "Powerwall", "Solar Roof"),
+        "services": ("Supercharger Network", "Full Self-Driving", "Tesla Insurance"),
+        "competitors": ("Ford", "GM", "Volkswagen", "Rivian", "BYD", "Lucid Motors"),
+        "key_people": ("Elon Musk (CEO)",),
         "revenue": "$96.7 billion (2023)",
         "employees": "140,000+"
     },
@@ -338,10 +444,10 @@ MOCK_COMPANY_DATA = {
         "industry": "Social Media, Technology, Virtual Reality",
         "founded": "2004",
         "headquarters": "Menlo Park, California, USA",
-        "products": ["Facebook", "Instagram", "WhatsApp", "Threads", "Meta Quest", "Ray-Ban Meta"],
-        "services": ["Meta Ads", "Workplace", "Horizon Worlds"],
-        "competitors": ["Google", "TikTok (ByteDance)", "Snap", "Twitter/X", "Apple"],
-        "key_people": ["Mark Zuckerberg (CEO)"],
+        "products": ("Facebook", "Instagram", "WhatsApp", "Threads", "Meta Quest", "Ray-Ban Meta"),
+        "services": ("Meta Ads", "Workplace", "Horizon Worlds"),
+        "competitors": ("Google", "TikTok (ByteDance)", "Snap", "Twitter/X", "Apple"),
+        "key_people": ("Mark Zuckerberg (CEO)",),
         "revenue": "$134.9 billion (2023)",
         "employees": "67,000+"
     },
@@ -351,10 +457,10 @@ MOCK_COMPANY_DATA = {
         "industry": "Information Technology, Business Consulting, Outsourcing",
         "founded": "1981",
         "headquarters": "Bangalore, Karnataka, India",
-        "products": ["Infosys Nia", "Infosys Cobalt", "EdgeVerve Systems", "Panaya", "Skava"],
-        "services": ["IT Consulting", "Business Process Outsourcing", "Cloud Services", "Digital Transformation", "Application Development"],
-        "competitors": ["TCS", "Wipro", "HCL Technologies", "Cognizant", "Accenture", "IBM"],
-        "key_people": ["Salil Parekh (CEO)", "Nandan Nilekani (Co-founder)"],
+        "products": ("Infosys Nia", "Infosys Cobalt", "EdgeVerve Systems", "Panaya", "Skava"),
+        "services": ("IT Consulting", "Business Process Outsourcing", "Cloud Services", "Digital Transformation", "Application Development"),
+        "competitors": ("TCS", "Wipro", "HCL Technologies", "Cognizant", "Accenture", "IBM"),
+        "key_people": ("Salil Parekh (CEO)", "Nandan Nilekani (Co-founder)"),
         "revenue": "$18.6 billion (2024)",
         "employees": "317,000+"
     },
@@ -364,10 +470,10 @@ MOCK_COMPANY_DATA = {
         "industry": "Information Technology, Consulting, Business Solutions",
         "founded": "1968",
         "headquarters": "Mumbai, Maharashtra, India",
-        "products": ["TCS BaNCS", "TCS iON", "ignio", "TCS MasterCraft"],
-        "services": ["IT Services", "Consulting", "Business Solutions", "Digital Transformation", "Cloud Infrastructure"],
-        "competitors": ["Infosys", "Wipro", "HCL Technologies", "Accenture", "IBM", "Cognizant"],
-        "key_people": ["K. Krithivasan (CEO)"],
+        "products": ("TCS BaNCS", "TCS iON", "ignio", "TCS MasterCraft"),
+        "services": ("IT Services", "Consulting", "Business Solutions", "Digital Transformation", "Cloud Infrastructure"),
+        "competitors": ("Infosys", "Wipro", "HCL Technologies", "Accenture", "IBM", "Cognizant"),
+        "key_people": ("K. Krithivasan (CEO)",),
         "revenue": "$29 billion (2024)",
         "employees": "614,000+"
     },
@@ -377,10 +483,10 @@ MOCK_COMPANY_DATA = {
         "industry": "Information Technology, Consulting, Business Process Services",
         "founded": "1945",
         "headquarters": "Bangalore, Karnataka, India",
-        "products": ["Wipro Holmes", "VIVID", "Wipro Digital Operations Platform"],
-        "services": ["Application Services", "Cloud Services", "Consulting", "Digital Operations", "Engineering Services"],
-        "competitors": ["TCS", "Infosys", "HCL Technologies", "Cognizant", "Accenture"],
-        "key_people": ["Thierry Delaporte (CEO)", "Azim Premji (Founder)"],
+        "products": ("Wipro Holmes", "VIVID", "Wipro Digital Operations Platform"),
+        "services": ("Application Services", "Cloud Services", "Consulting", "Digital Operations", "Engineering Services"),
+        "competitors": ("TCS", "Infosys", "HCL Technologies", "Cognizant", "Accenture"),
+        "key_people": ("Thierry Delaporte (CEO)", "Azim Premji (Founder)"),
         "revenue": "$11.3 billion (2024)",
         "employees": "234,000+"
     },
@@ -390,10 +496,10 @@ MOCK_COMPANY_DATA = {
         "industry": "Semiconductors, Technology, Computing",
         "founded": "1968",
         "headquarters": "Santa Clara, California, USA",
-        "products": ["Intel Core Processors", "Intel Xeon", "Intel Arc GPUs", "Intel Optane"],
-        "services": ["Intel Foundry Services", "Intel Developer Cloud"],
-        "competitors": ["AMD", "NVIDIA", "Qualcomm", "Samsung", "TSMC", "ARM"],
-        "key_people": ["Pat Gelsinger (CEO)"],
+        "products": ("Intel Core Processors", "Intel Xeon", "Intel Arc GPUs", "Intel Optane"),
+        "services": ("Intel Foundry Services", "Intel Developer Cloud"),
+        "competitors": ("AMD", "NVIDIA", "Qualcomm", "Samsung", "TSMC", "ARM"),
+        "key_people": ("Pat Gelsinger (CEO)",),
         "revenue": "$54.2 billion (2023)",
         "employees": "124,800+"
     },
@@ -403,10 +509,10 @@ MOCK_COMPANY_DATA = {
         "industry": "Semiconductors, AI, Graphics Processing",
         "founded": "1993",
         "headquarters": "Santa Clara, California, USA",
-        "products": ["GeForce GPUs", "RTX Series", "Quadro", "Tesla GPUs", "NVIDIA DGX", "Jetson"],
-        "services": ["NVIDIA AI Enterprise", "GeForce NOW", "NVIDIA Omniverse"],
-        "competitors": ["AMD", "Intel", "Qualcomm", "Google TPU", "Microsoft"],
-        "key_people": ["Jensen Huang (CEO & Co-founder)"],
+        "products": ("GeForce GPUs", "RTX Series", "Quadro", "Tesla GPUs", "NVIDIA DGX", "Jetson"),
+        "services": ("NVIDIA AI Enterprise", "GeForce NOW", "NVIDIA Omniverse"),
+        "competitors": ("AMD", "Intel", "Qualcomm", "Google TPU", "Microsoft"),
+        "key_people": ("Jensen Huang (CEO & Co-founder)",),
         "revenue": "$60.9 billion (2024)",
         "employees": "29,600+"
     },
@@ -416,37 +522,100 @@ MOCK_COMPANY_DATA = {
         "industry": "Entertainment, Streaming, Technology",
         "founded": "1997",
         "headquarters": "Los Gatos, California, USA",
-        "products": ["Netflix Streaming", "Netflix DVD"],
-        "services": ["Video Streaming", "Original Content Production"],
-        "competitors": ["Disney+", "Amazon Prime Video", "HBO Max", "Apple TV+", "Hulu"],
-        "key_people": ["Ted Sarandos (Co-CEO)", "Greg Peters (Co-CEO)"],
+        "products": ("Netflix Streaming", "Netflix DVD"),
+        "services": ("Video Streaming", "Original Content Production"),
+        "competitors": ("Disney+", "Amazon Prime Video", "HBO Max", "Apple TV+", "Hulu"),
+        "key_people": ("Ted Sarandos (Co-CEO)", "Greg Peters (Co-CEO)"),
         "revenue": "$33.7 billion (2023)",
         "employees": "13,000+"
     }
 }
 
 
+# The catalog never changes at runtime, so derive lookup forms once
+_MOCK_KEYS = tuple(MOCK_COMPANY_DATA)
+_MOCK_NAME_LOWER = {key: data["name"].lower() for key, data in MOCK_COMPANY_DATA.items()}
+
+# Character trie over the mock catalog, built once. Every node records the
+# first mock key reachable through it (_TRIE_FIRST) so "query is a prefix of
+# a key or of a word in a company name" is one walk; nodes that end a mock
+# key also record it (_TRIE_KEY) for "query starts with a key" lookups.
+_TRIE_FIRST = "\0first"
+_TRIE_KEY = "\0key"
+
+
+def _build_mock_trie() -> Dict:
+    root: Dict = {}
+    for key, name_lower in _MOCK_NAME_LOWER.items():
+        word_starts = [name_lower[i:] for i, ch in enumerate(name_lower)
+                       if ch.isalnum() and (i == 0 or not name_lower[i - 1].isalnum())]
+        for entry in (key, *word_starts):
+            node = root
+            for ch in entry:
+                node = node.setdefault(ch, {})
+                node.setdefault(_TRIE_FIRST, key)
+            if entry == key:
+                node.setdefault(_TRIE_KEY, key)
+    return root
+
+
+_MOCK_TRIE = _build_mock_trie()
+
+
+def _trie_prefix_match(normalized: str) -> Optional[str]:
+    """Mock key for a query that prefixes a key or a word-initial part of a name."""
+    node = _MOCK_TRIE
+    for ch in normalized:
+        node = node.get(ch)
+        if node is None:
+            return None
+    return node.get(_TRIE_FIRST)
+
+
+def _trie_key_in_query(normalized: str) -> Optional[str]:
+    """Longest mock key that starts at a word boundary inside the query."""
+    for start, ch in enumerate(normalized):
+        if start and normalized[start - 1].isalnum():
+            continue
+        node, found = _MOCK_TRIE, None
+        for c in normalized[start:]:
+            node = node.get(c)
+            if node is None:
+                break
+            found = node.get(_TRIE_KEY, found)
+        if found:
+            return found
+    return None
+
+
 def get_mock_data(company_name: str) -> Optional[Dict]:
     """Get mock data for common companies with fuzzy matching."""
-    normalized = company_name.lower().strip()
+    key = _match_mock_key(company_name.lower().strip())
+    return MOCK_COMPANY_DATA[key] if key else None
+
 
+@lru_cache(maxsize=512)
+def _match_mock_key(normalized: str) -> Optional[str]:
+    """Resolve a normalized name to a mock key; memoized since the catalog is static."""
     # Direct match
     if normalized in MOCK_COMPANY_DATA:
-        return MOCK_COMPANY_DATA[normalized]
-
-    # Partial match
-    for key, data in MOCK_COMPANY_DATA.items():
-        if key in normalized or normalized in key:
-            return data
-        if normalized in data["name"].lower():
-            return data
-
-    # Fuzzy match against mock data keys
-    mock_keys = list(MOCK_COMPANY_DATA.keys())
-    result = process.extractOne(normalized, mock_keys, scorer=fuzz.WRatio, score_cutoff=80)
+        return normalized
+
+    # A mock key as a whole word ("apple inc", "the tesla company") is one hash per word
+    for token in normalized.split():
+        if token in MOCK_COMPANY_DATA:
+            return token
+
+    # Partial match: "apple inc" -> apple, "micro" -> microsoft, "alphabet" -> google
+    key = _trie_key_in_query(normalized) or _trie_prefix_match(normalized)
+    if key:
+        return key
+
+    # Fuzzy match against mock data keys (misspellings; containment was handled above)
+    result = process.extractOne(normalized, _MOCK_KEYS, scorer=fuzz.ratio, processor=None, score_cutoff=80)
     if result:
         matched_key, score, _ = result
-        return MOCK_COMPANY_DATA[matched_key]
+        return matched_key
 
     return None
 
@@ -455,6 +624,78 @@ def get_mock_data(company_name: str) -> Optional[Dict]:
 # MAIN RESEARCH FUNCTION
 # ============================================
 
+# Recent misses (normalized name -> monotonic time), oldest first
+MISS_CACHE_SIZE = 256
+MISS_CACHE_TTL_SECONDS = 300
+_WIKI_MISS_CACHE: "OrderedDict[str, float]" = OrderedDict()
+_WIKI_MISS_LOCK = threading.Lock()
+_miss_cache_enabled = True
+
+
+def set_miss_cache_enabled(enabled: bool) -> None:
+    """Turn remembering recent misses on or off; turning it off forgets them."""
+    global _miss_cache_enabled
+    with _WIKI_MISS_LOCK:
+        _miss_cache_enabled = enabled
+        if not enabled:
+            _WIKI_MISS_CACHE.clear()
+
+
+def _recently_missed(normalized: str) -> bool:
+    if not _miss_cache_enabled:
+        return False
+    with _WIKI_MISS_LOCK:
+        missed_at = _WIKI_MISS_CACHE.get(normalized)
+        if missed_at is None:
+            return False
+        if time.monotonic() - missed_at < MISS_CACHE_TTL_SECONDS:
+            _WIKI_MISS_CACHE.move_to_end(normalized)
+            return True
+        del _WIKI_MISS_CACHE[normalized]
+        return False
+
+
+def _remember_miss(normalized: str) -> None:
+    with _WIKI_MISS_LOCK:
+        if not _miss_cache_enabled:
+            return
+        _WIKI_MISS_CACHE[normalized] = time.monotonic()
+        _WIKI_MISS_CACHE.move_to_end(normalized)
+        if len(_WIKI_MISS_CACHE) > MISS_CACHE_SIZE:
+            _WIKI_MISS_CACHE.popitem(last=False)
+
+# Mock entries never change, so their gaps and whole results are built at
+# import. Every hit returns the same instance, and freezing ResearchResult
+# does not freeze its data dict or lists: callers copy before storing them
+_MOCK_GAPS = {key: identify_data_gaps(data) for key, data in MOCK_COMPANY_DATA.items()}
+_MOCK_RESULTS = {
+    key: ResearchResult(
+        success=True,
+        company_name=data["name"],
+        data=data,
+        confidence=0.95,
+        sources=["Internal Database"],
+        gaps=_MOCK_GAPS[key],
+        conflicts=[]
+    )
+    for key, data in MOCK_COMPANY_DATA.items()
+}
+
+
+def _company_not_found(company_name: str) -> ResearchResult:
+    """The hard-fail result for a name with no usable company data."""
+    return ResearchResult(
+        success=False,
+        company_name=company_name,
+        data=None,
+        confidence=0.0,
+        sources=[],
+        gaps=["No valid company data"],
+        conflicts=[],
+        error=f"No company found matching '{company_name}'."
+    )
+
+
 def fetch_company_data(company_name: str) -> ResearchResult:
     """
     Main function to fetch company data.
@@ -464,24 +705,28 @@ def fetch_company_data(company_name: str) -> ResearchResult:
     gaps = []
     conflicts = []
 
+    # Inputs that can never be a company fail before any lookup or network call
+    normalized = company_name.lower().strip()
+    if len(normalized) < 2 or normalized.isdigit() or normalized in STOP_WORDS:
+        return _company_not_found(company_name)
+
+    # A name that just missed everywhere will miss again; skip the round trip
+    if _recently_missed(normalized):
+        return _company_not_found(company_name)
+
     # FIRST: Check mock data
-    mock_data = get_mock_data(company_name)
-
-    if mock_data:
-        return ResearchResult(
-            success=True,
-            company_name=mock_data.get("name", company_name),
-            data=mock_data,
-            confidence=0.95,
-            sources=["Internal Database"],
-            gaps=identify_data_gaps(mock_data),
-            conflicts=[]
-        )
+    mock_key = _match_mock_key(normalized)
+
+    if mock_key:
+        return _MOCK_RESULTS[mock_key]
 
     # No mock data - try Wikipedia
     search_query = f"{company_name} company"
-    search_results = search_wikipedia(search_query)
+    search_results = _search_wikipedia(search_query)
 
+    # Only a lookup that completed and found nothing counts as a miss; a
+    # timeout or connection error should be retried on the next attempt
+    lookup_failed = search_results is None
     wiki_data = None
     match_score = None
 
@@ -498,7 +743,9 @@ def fetch_company_data(company_name: str) -> ResearchResult:
             best_match = search_results[0]
             matched_title = best_match.get("title")
 
-        wiki_page = get_wikipedia_page(matched_title)
+        wiki_pages, page_failed = _get_wikipedia_pages([matched_title])
+        wiki_page = wiki_pages.get(matched_title)
+        lookup_failed = lookup_failed or page_failed
 
         if wiki_page:
             wiki_data = extract_company_info(wiki_page["extract"], company_name)
@@ -514,16 +761,9 @@ def fetch_company_data(company_name: str) -> ResearchResult:
         sources.append("Wikipedia")
     else:
     # HARD FAIL — no usable company data found
-        return ResearchResult(
-        success=False,
-        company_name=company_name,
-        data=None,
-        confidence=0.0,
-        sources=[],
-        gaps=["No valid company data"],
-        conflicts=[],
-        error=f"No company found matching '{company_name}'."
-    )
+        if not lookup_failed:
+            _remember_miss(normalized)
+        return _company_not_found(company_name)
 
 
     gaps.extend(identify_data_gaps(final_data))
@@ -534,7 +774,7 @@ def fetch_company_data(company_name: str) -> ResearchResult:
         data=final_data,
         confidence=confidence,
         sources=sources,
-        gaps=list(set(gaps)),
+        gaps=list(dict.fromkeys(gaps)),
         conflicts=conflicts
     )
 
@@ -562,29 +802,61 @@ def normalize_research_data(data: Dict) -> Dict:
     return normalized
 
 
+_RESEARCH_PROMPT_TEMPLATE = (
+    "Company: {name}\n"
+    "Description: {description}\n"
+    "Industry: {industry}\n"
+    "Founded: {founded}\n"
+    "Headquarters: {headquarters}\n"
+    "Products: {products}\n"
+    "Services: {services}\n"
+    "Competitors: {competitors}\n"
+    "Key People: {key_people}\n"
+    "Revenue: {revenue}\n"
+    "Employees: {employees}\n"
+    "\nData Confidence: {confidence:.0%}\n"
+    "Sources: {sources}"
+)
+
+
+_LIST_FIELDS = ("products", "services", "competitors", "key_people")
+
+# The mock entries are read-only, so their joined list fields are computed
+# once per mock key. Data is matched to its key by name, then confirmed to be
+# the catalogue entry itself; anything else (Wikipedia, unpickled results)
+# is joined per call.
+_MOCK_JOINED = {
+    key: {field: ', '.join(data.get(field, ())) or 'N/A' for field in _LIST_FIELDS}
+    for key, data in MOCK_COMPANY_DATA.items()
+}
+_MOCK_KEY_BY_NAME = {data["name"]: key for key, data in MOCK_COMPANY_DATA.items()}
+
+
 def format_research_for_prompt(result: ResearchResult) -> str:
     """Format research result as a string for LLM prompts."""
     if not result.success:
         return f"Limited information found for {result.company_name}."
 
     data = result.data
-    sections = [
-        f"Company: {data.get('name', 'Unknown')}",
-        f"Description: {data.get('description', 'N/A')}",
-        f"Industry: {data.get('industry', 'N/A')}",
-        f"Founded: {data.get('founded', 'N/A')}",
-        f"Headquarters: {data.get('headquarters', 'N/A')}",
-        f"Products: {', '.join(data.get('products', [])) or 'N/A'}",
-        f"Services: {', '.join(data.get('services', [])) or 'N/A'}",
-        f"Competitors: {', '.join(data.get('competitors', [])) or 'N/A'}",
-        f"Key People: {', '.join(data.get('key_people', [])) or 'N/A'}",
-        f"Revenue: {data.get('revenue', 'N/A')}",
-        f"Employees: {data.get('employees', 'N/A')}",
-        f"\nData Confidence: {result.confidence:.0%}",
-        f"Sources: {', '.join(result.sources)}"
-    ]
+    mock_key = _MOCK_KEY_BY_NAME.get(data.get('name'))
+    if mock_key is not None and data is MOCK_COMPANY_DATA[mock_key]:
+        joined = _MOCK_JOINED[mock_key]
+    else:
+        joined = {field: ', '.join(data.get(field, [])) or 'N/A' for field in _LIST_FIELDS}
+    formatted = _RESEARCH_PROMPT_TEMPLATE.format(
+        name=data.get('name', 'Unknown'),
+        description=data.get('description', 'N/A'),
+        industry=data.get('industry', 'N/A'),
+        founded=data.get('founded', 'N/A'),
+        headquarters=data.get('headquarters', 'N/A'),
+        **joined,
+        revenue=data.get('revenue', 'N/A'),
+        employees=data.get('employees', 'N/A'),
+        confidence=result.confidence,
+        sources=', '.join(result.sources)
+    )
 
     if result.gaps:
-        sections.append(f"Information Gaps: {', '.join(result.gaps)}")
+        formatted += f"\nInformation Gaps: {', '.join(result.gaps)}"
 
-    return "\n".join(sections)
\ No newline at end of file
+    return formatted
\ No newline at end of file
@@ -5,11 +5,28 @@ This module manages the conversation state using a simple Python dictionary.
 It tracks conversation history, user context, research data, and the account plan.
 """
 
-from typing import Dict, List, Any, Optional
+import time
+from collections import deque
+from dataclasses import dataclass
+from itertools import islice
+from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime
 from enum import Enum
 
 
+# Oldest messages drop off once a session grows past this many turns
+MAX_HISTORY = 200
+
+# Sections an account plan needs before it counts as complete
+REQUIRED_PLAN_SECTIONS = (
+    "company_overview",
+    "key_products_services",
+    "competitors",
+    "opportunities",
+    "risks"
+)
+
+
 class ConversationPhase(Enum):
     """Tracks where we are in the conversation flow."""
     GREETING = "greeting"
@@ -31,18 +48,43 @@ class UserPersona(Enum):
     EDGE_CASE = "edge_case"
 
 
+@dataclass(slots=True)
+class PendingClarification:
+    """A question the agent is waiting on the user to answer."""
+    kind: str  # "company_confirmation", "low_confidence" or "company_disambiguation"
+    company: Optional[str] = None
+    options: Tuple[str, ...] = ()
+    options_lower: Tuple[str, ...] = ()
+    original_input: str = ""
+    confidence: float = 0.0
+    is_alias: bool = False
+
+
+# (monotonic millisecond, ISO string); swapped as one tuple so readers never see a torn pair
+_now_cache: Tuple[int, str] = (-1, "")
+
+
+def _now_iso() -> str:
+    """datetime.now().isoformat(), reused for calls within the same millisecond."""
+    global _now_cache
+    tick = time.monotonic_ns() // 1_000_000
+    if _now_cache[0] != tick:
+        _now_cache = (tick, datetime.now().isoformat())
+    return _now_cache[1]
+
+
 def create_initial_state() -> Dict[str, Any]:
     """Create a fresh conversation state dictionary."""
     return {
         # Session metadata
         "session_id": datetime.now().strftime("%Y%m%d_%H%M%S"),
-        "started_at": datetime.now().isoformat(),
-        "last_activity": datetime.now().isoformat(),
+        "started_at": _now_iso(),
+        "last_activity": _now_iso(),
         
         # Conversation tracking
         "phase": ConversationPhase.GREETING.value,
         "message_count": 0,
-        "conversation_history": [],  # List of {"role": str, "content": str}
+        "conversation_history": deque(maxlen=MAX_HISTORY),  # Deque of {"role": str, "content": str}
         
         # User understanding
         "detected_persona": UserPersona.UNKNOWN.value,
@@ -77,7 +119,7 @@ def create_initial_state() -> Dict[str, Any]:
         },
         
         # Pending actions
-        "pending_clarification": None,
+        "pending_clarification": None,  # Optional[PendingClarification]
         "suggested_actions": [],
         
         # Error tracking
@@ -85,18 +127,24 @@ def create_initial_state() -> Dict[str, Any]:
     }
 
 
+def _deep_update(base: Dict, updates: Dict) -> Dict:
+    """Merge nested dicts from updates into base in place, without recursion."""
+    stack = [(base, updates)]
+    while stack:
+        target, source = stack.pop()
+        for key, value in source.items():
+            current = target.get(key)
+            if isinstance(current, dict) and isinstance(value, dict):
+                stack.append((current, value))
+            else:
+                target[key] = value
+    return base
+
+
 def update_state(state: Dict, updates: Dict) -> Dict:
     """Update state with new values, preserving structure."""
-    def deep_update(base: Dict, updates: Dict) -> Dict:
-        for key, value in updates.items():
-            if key in base and isinstance(base[key], dict) and isinstance(value, dict):
-                deep_update(base[key], value)
-            else:
-                base[key] = value
-        return base
-    
-    state["last_activity"] = datetime.now().isoformat()
-    return deep_update(state, updates)
+    state["last_activity"] = _now_iso()
+    return _deep_update(state, updates)
 
 
 def add_message(state: Dict, role: str, content: str) -> Dict:
@@ -104,22 +152,25 @@ def add_message(state: Dict, role: str, content: str) -> Dict:
     state["conversation_history"].append({
         "role": role,
         "content": content,
-        "timestamp": datetime.now().isoformat()
+        "timestamp": _now_iso()
     })
     state["message_count"] += 1
-    state["last_activity"] = datetime.now().isoformat()
+    state["last_activity"] = _now_iso()
     return state
 
 
 def get_recent_context(state: Dict, n_messages: int = 10) -> List[Dict]:
     """Get the most recent n messages for context."""
-    return state["conversation_history"][-n_messages:]
+    # Walk back from the newest entry so cost is O(n_messages), not O(history)
+    recent = list(islice(reversed(state["conversation_history"]), n_messages))
+    recent.reverse()
+    return recent
 
 
-def update_persona_signals(state: Dict, signal_type: str) -> Dict:
+def update_persona_signals(state: Dict, signal_type: str, delta: int = 1) -> Dict:
     """Update persona detection signals."""
     if signal_type in state["persona_signals"]:
-        state["persona_signals"][signal_type] += 1
+        state["persona_signals"][signal_type] += delta
     
     # Re-evaluate persona based on signals
     signals = state["persona_signals"]
@@ -146,21 +197,29 @@ def add_plan_update(state: Dict, section: str, old_content: str, new_content: st
         "section": section,
         "old_content": old_content,
         "new_content": new_content,
-        "updated_at": datetime.now().isoformat()
+        "updated_at": _now_iso()
     })
-    state["account_plan"]["last_updated"] = datetime.now().isoformat()
+    state["account_plan"]["last_updated"] = _now_iso()
     return state
 
 
+_SECTION_TRANS = str.maketrans(" /", "__")
+
+
+def section_key_for(section: str) -> str:
+    """Turn a section name like 'Key Products/Services' into its plan key."""
+    return section.lower().translate(_SECTION_TRANS)
+
+
 def get_plan_section(state: Dict, section: str) -> Optional[str]:
     """Get a specific section from the account plan."""
-    section_key = section.lower().replace(" ", "_").replace("/", "_")
+    section_key = section_key_for(section)
     return state["account_plan"].get(section_key)
 
 
 def set_plan_section(state: Dict, section: str, content: str) -> Dict:
     """Set a specific section in the account plan."""
-    section_key = section.lower().replace(" ", "_").replace("/", "_")
+    section_key = section_key_for(section)
     
     # Track the update if there was previous content
     old_content = state["account_plan"].get(section_key)
@@ -187,15 +246,7 @@ def clear_research_data(state: Dict) -> Dict:
 
 def has_complete_plan(state: Dict) -> bool:
     """Check if all plan sections are filled."""
-    plan = state["account_plan"]
-    required_sections = [
-        "company_overview",
-        "key_products_services", 
-        "competitors",
-        "opportunities",
-        "risks"
-    ]
-    return all(plan.get(section) is not None for section in required_sections)
+    return None not in map(state["account_plan"].get, REQUIRED_PLAN_SECTIONS)
 
 
 def get_state_summary(state: Dict) -> str:
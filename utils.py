@@ -6,10 +6,23 @@ FIXED: Added logic to strip quotes from update content to prevent false farewell
 """
 
 import re
+import json
 import textwrap
-from typing import Dict, List, Optional, Tuple
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 from datetime import datetime
 
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib parser
+    orjson = None
+
+try:
+    import re2
+except ImportError:  # google-re2 is optional; the user-text patterns fall back to re
+    re2 = None
+
 
 # ============================================
 # NON-COMPANY WORDS (Centralized)
@@ -36,42 +49,111 @@ COMMAND_WORDS = {
     "update", "change", "modify", "edit", "reset", "clear"
 }
 
+# Unions used for membership tests across modules, built once here so they can't drift
+STOP_WORDS = frozenset().union(CONFIRMATION_WORDS, GREETING_WORDS, FAREWELL_WORDS, COMMAND_WORDS)
+NAME_STOP_WORDS = frozenset().union(CONFIRMATION_WORDS, GREETING_WORDS, FAREWELL_WORDS)
+
+
+def _substring_re(words: Iterable[str]) -> "re.Pattern[str]":
+    """Compile a pattern that finds any of the given keywords anywhere in a string."""
+    return re.compile('|'.join(map(re.escape, words)))
+
+
+# Keyword scanners for is_greeting / is_farewell
+_GREETING_SUBSTR_RE = _substring_re(GREETING_WORDS)
+_FAREWELL_SUBSTR_RE = _substring_re(FAREWELL_WORDS)
+
+
+
+# ============================================
+# JSON HELPERS
+# ============================================
+
+def json_loads(text: str) -> Any:
+    """Parse JSON, using orjson when it is installed."""
+    if orjson is not None:
+        # orjson.JSONDecodeError subclasses json.JSONDecodeError
+        return orjson.loads(text.encode())
+    return json.loads(text)
+
 
 # ============================================
 # TEXT PROCESSING UTILITIES
 # ============================================
 
+# Chat inputs are short and the same replies ("yes", "1", "hi") keep coming
+# back, so the pure str -> result helpers below are memoized.
+@lru_cache(maxsize=1024)
 def clean_text(text: str) -> str:
     """Clean and normalize text input."""
     if not text:
         return ""
-    text = re.sub(r'\s+', ' ', text)
-    text = text.strip()
-    return text
+    return ' '.join(text.split())
+
+
+# The _is_* variants take text that is already cleaned and lowercased, so
+# detect_intent normalizes once; the public wrappers normalize for callers.
+def _is_confirmation(text_lower: str) -> bool:
+    return text_lower in CONFIRMATION_WORDS
+
+
+def _is_greeting(text_lower: str) -> bool:
+    return text_lower in GREETING_WORDS or _GREETING_SUBSTR_RE.search(text_lower) is not None
 
 
+def _is_farewell(text_lower: str) -> bool:
+    return text_lower in FAREWELL_WORDS or _FAREWELL_SUBSTR_RE.search(text_lower) is not None
+
+
+@lru_cache(maxsize=1024)
 def is_confirmation_response(text: str) -> bool:
     """Check if text is a confirmation/denial response."""
-    text_lower = clean_text(text).lower()
-    return text_lower in CONFIRMATION_WORDS
+    return _is_confirmation(clean_text(text).lower())
+
+
+def _is_number(text_clean: str) -> bool:
+    """Digits with an optional trailing period ("2", "2."), on already-cleaned text."""
+    if text_clean.endswith('.'):
+        text_clean = text_clean[:-1]
+    return text_clean.isdecimal()
 
 
 def is_numeric_selection(text: str) -> bool:
     """Check if text is a numeric selection (1, 2, 3, etc.)."""
-    text_clean = clean_text(text)
-    return bool(re.match(r'^\d+\.?$', text_clean))
+    return _is_number(clean_text(text))
 
 
+@lru_cache(maxsize=1024)
 def is_greeting(text: str) -> bool:
     """Check if text is a greeting."""
-    text_lower = clean_text(text).lower()
-    return text_lower in GREETING_WORDS or any(g in text_lower for g in GREETING_WORDS)
+    return _is_greeting(clean_text(text).lower())
 
 
+@lru_cache(maxsize=1024)
 def is_farewell(text: str) -> bool:
     """Check if text is a farewell."""
-    text_lower = clean_text(text).lower()
-    return text_lower in FAREWELL_WORDS or any(f in text_lower for f in FAREWELL_WORDS)
+    return _is_farewell(clean_text(text).lower())
+
+
+def _compile_linear(pattern: str) -> Any:
+    """
+    Compile a case-insensitive pattern with RE2 when it is installed, so
+    lazy (.+?) groups run in linear time on arbitrary user text; patterns
+    RE2 can't handle, or a missing re2, fall back to the stdlib engine.
+    """
+    pattern = "(?i)" + pattern
+    if re2 is not None:
+        try:
+            return re2.compile(pattern)
+        except re2.error:
+            pass
+    return re.compile(pattern)
+
+
+_EXTRACT_NAME_RES = tuple(map(_compile_linear, (
+    r"(?:research|look up|find|about|for|analyze|tell me about)\s+([A-Za-z][A-Za-z0-9\s&.'-]+?)(?:\s+(?:company|inc|corp|ltd|llc))?(?:\.|$|\?)",
+    r"(?:company|organization|firm)\s+(?:called|named)?\s*([A-Za-z][A-Za-z0-9\s&.'-]+)",
+)))
 
 
 def extract_company_name(text: str) -> Optional[str]:
@@ -83,11 +165,11 @@ def extract_company_name(text: str) -> Optional[str]:
     text_lower = text.lower()
     
     # Never extract these as company names
-    if text_lower in CONFIRMATION_WORDS | GREETING_WORDS | FAREWELL_WORDS | COMMAND_WORDS:
+    if text_lower in STOP_WORDS:
         return None
     
     # Never extract pure numbers
-    if re.match(r'^\d+\.?$', text_lower):
+    if _is_number(text):
         return None
     
     # Never extract very short inputs
@@ -95,23 +177,18 @@ def extract_company_name(text: str) -> Optional[str]:
         return None
     
     # Check for explicit research patterns
-    patterns = [
-        r"(?:research|look up|find|about|for|analyze|tell me about)\s+([A-Za-z][A-Za-z0-9\s&.'-]+?)(?:\s+(?:company|inc|corp|ltd|llc))?(?:\.|$|\?)",
-        r"(?:company|organization|firm)\s+(?:called|named)?\s*([A-Za-z][A-Za-z0-9\s&.'-]+)",
-    ]
-    
-    for pattern in patterns:
-        match = re.search(pattern, text, re.IGNORECASE)
+    for pattern in _EXTRACT_NAME_RES:
+        match = pattern.search(text)
         if match:
             name = clean_text(match.group(1))
-            if name.lower() not in CONFIRMATION_WORDS | GREETING_WORDS | FAREWELL_WORDS:
+            if name.lower() not in NAME_STOP_WORDS:
                 return name
     
     # If text is 1-3 capitalized words, might be a company name
     words = text.split()
     if 1 <= len(words) <= 3:
         # Check it's not a common word
-        if text_lower not in CONFIRMATION_WORDS | GREETING_WORDS | FAREWELL_WORDS | COMMAND_WORDS:
+        if text_lower not in STOP_WORDS:
             # Has at least one capital letter or is all caps
             if text[0].isupper() or text.isupper():
                 return text
@@ -119,35 +196,47 @@ def extract_company_name(text: str) -> Optional[str]:
     return None
 
 
+_UPDATE_PATTERNS = (
+    r"(?:update|change|modify|edit|revise)\s+(?:the\s+)?(.+?)\s+(?:with|to|section)[:.]?\s*(.+)",
+    r"(?:add|include)\s+(?:to\s+)?(?:the\s+)?(.+?)[:.]?\s*(.+)",
+    r"(.+?)\s+(?:should|needs to)\s+(?:say|include|be)[:.]?\s*(.+)"
+)
+_UPDATE_RES = tuple(map(_compile_linear, _UPDATE_PATTERNS))
+# Any-branch alternation: one scan rejects the (common) non-update message
+# before the patterns are tried one by one in priority order
+_UPDATE_ANY_RE = _compile_linear("|".join(f"(?:{p})" for p in _UPDATE_PATTERNS))
+
+# Section mentions, checked in this order against the matched phrase
+_UPDATE_SECTION_NAMES = (
+    ('overview', 'company_overview'),
+    ('company overview', 'company_overview'),
+    ('products', 'key_products_services'),
+    ('services', 'key_products_services'),
+    ('products/services', 'key_products_services'),
+    ('key products', 'key_products_services'),
+    ('competitors', 'competitors'),
+    ('competition', 'competitors'),
+    ('opportunities', 'opportunities'),
+    ('risks', 'risks'),
+    ('risk', 'risks')
+)
+
+
 def is_update_request(text: str) -> Tuple[bool, Optional[str], Optional[str]]:
     """
     Check if the user is requesting to update a plan section.
     Returns (is_update, section_name, new_content).
     """
-    text = clean_text(text)
-    
-    section_names = {
-        'overview': 'company_overview',
-        'company overview': 'company_overview',
-        'products': 'key_products_services',
-        'services': 'key_products_services',
-        'products/services': 'key_products_services',
-        'key products': 'key_products_services',
-        'competitors': 'competitors',
-        'competition': 'competitors',
-        'opportunities': 'opportunities',
-        'risks': 'risks',
-        'risk': 'risks'
-    }
-    
-    update_patterns = [
-        r"(?:update|change|modify|edit|revise)\s+(?:the\s+)?(.+?)\s+(?:with|to|section)[:.]?\s*(.+)",
-        r"(?:add|include)\s+(?:to\s+)?(?:the\s+)?(.+?)[:.]?\s*(.+)",
-        r"(.+?)\s+(?:should|needs to)\s+(?:say|include|be)[:.]?\s*(.+)"
-    ]
+    return _match_update(clean_text(text))
+
+
+def _match_update(text: str) -> Tuple[bool, Optional[str], Optional[str]]:
+    """is_update_request on already-cleaned text."""
+    if not _UPDATE_ANY_RE.search(text):
+        return False, None, None
     
-    for pattern in update_patterns:
-        match = re.search(pattern, text, re.IGNORECASE)
+    for pattern in _UPDATE_RES:
+        match = pattern.search(text)
         if match:
             section_mention = match.group(1).lower().strip()
             new_content = match.group(2).strip()
@@ -155,13 +244,64 @@ def is_update_request(text: str) -> Tuple[bool, Optional[str], Optional[str]]:
             # CRITICAL FIX: Strip surrounding single/double quotes from the content
             new_content = new_content.strip('"').strip("'")
             
-            for key, section in section_names.items():
+            for key, section in _UPDATE_SECTION_NAMES:
                 if key in section_mention:
                     return True, section, new_content
     
     return False, None, None
 
 
+_GREETING_RES = tuple(map(re.compile, (
+    r'^(um+|uh+|er+|ah+)?[,\s]*(hi|hello|hey|hii+|greetings)\b',
+    r'^(hi|hello|hey|hii+)\b',
+    r'^(um+|uh+|er+|ah+)\??$',
+)))
+_HELP_RE = re.compile(r'^help$|^what can you|^how do i|^how to')
+_VIEW_PLAN_RE = re.compile(r'(show|display|view|see|print)\s+(the\s+)?(plan|account plan|report)')
+_RESEARCH_RE = re.compile(r'^(research|look up|find|analyze|tell me about|information on|learn about)\s+')
+
+# First characters the ^-anchored patterns above can match on, so
+# detect_intent skips them outright for text that starts any other way
+_GREETING_FIRST_CHARS = frozenset("uheag,")
+_HELP_FIRST_CHARS = frozenset("hw")
+_RESEARCH_FIRST_CHARS = frozenset("rlfati")
+
+# Off-topic signals, matched as whole words/phrases by a single alternation
+_OFF_TOPIC_SIGNALS = (
+    "weather", "rain", "snow", "sunny",
+
+    "joke", "fun fact", "make me laugh",
+    "tell me something funny",
+
+    "story", "tell me a story",
+    "movie recommendation", "song recommendation",
+
+    "recipe", "how to cook", "what should i eat",
+
+    "book me a flight", "book a ticket", "flight status",
+    "hotel", "where is", "directions to",
+
+    "sports score", "cricket score", "who won the match",
+
+    "how are you", "who are you", "what are you",
+    "your name", "where are you from",
+
+    "fix my phone", "calculator", "unit conversion",
+
+    "solve this math", "calculate",
+    "integral of", "differentiation",
+
+    "relationship advice", "love advice",
+    "girlfriend", "boyfriend", "crush",
+
+    "meaning of life", "purpose of life", "existence",
+
+    "who will win", "horoscope", "zodiac"
+)
+_OFF_TOPIC_RE = re.compile(r'\b(?:' + '|'.join(_OFF_TOPIC_SIGNALS) + r')\b')
+
+
+@lru_cache(maxsize=2048)
 def detect_intent(text: str) -> str:
     """
     Detect the user's intent from their message.
@@ -169,142 +309,171 @@ def detect_intent(text: str) -> str:
     """
     text_clean = clean_text(text)
     text_lower = text_clean.lower()
+    first = text_lower[:1]
+    
+    # Digit-led input: a bare number can't be a confusion or confirmation
+    # phrase, so resolve selections before any other check runs
+    if first.isdigit() and _is_number(text_clean):
+        return "selection"
     
     # Remove filler words and punctuation for intent detection
-    text_stripped = re.sub(r'^(um+|uh+|er+|ah+|hmm+)[,\s]*', '', text_lower).strip()
+    text_stripped = strip_filler_prefix(text_lower)
     
     # Priority 1: Check for explicit confusion signals (HIGH PRIORITY)
-    if detect_confusion_signals(text_lower) or detect_confusion_signals(text_stripped):
-        # Explicitly check for "i don't know" or similar to avoid misclassifying it as research
-        confusion_phrases = [r"i don'?t (know|understand|get)", r"not sure", r"help me understand"]
-        if any(re.search(p, text_lower) for p in confusion_phrases):
-             # Ensure a confused user asking a question (e.g. "what is this?") is NOT flagged as off_topic
-             return "unclear" 
-
+    # Only strong phrases like "i don't know" decide the intent here (so they
+    # aren't misread as research); every strong phrase is also a confusion
+    # signal, so one scan of the strong alternation is the whole check.
+    if _CONFUSION_STRONG_RE.search(text_lower):
+        return "unclear"
 
     # Priority 2: Check for confirmation/denial
-    if is_confirmation_response(text_lower) or is_confirmation_response(text_stripped):
+    if _is_confirmation(text_lower) or _is_confirmation(text_stripped):
         return "confirmation"
     
     # Priority 3: Check for numeric selection
-    if is_numeric_selection(text_clean):
+    if _is_number(text_clean):
         return "selection"
     
     # Priority 4: Check for greetings (including hesitant ones like "um, hi?")
-    greeting_patterns = [
-        r'^(um+|uh+|er+|ah+)?[,\s]*(hi|hello|hey|hii+|greetings)\b',
-        r'^(hi|hello|hey|hii+)\b',
-        r'^(um+|uh+|er+|ah+)\??$',
-    ]
-    for pattern in greeting_patterns:
-        if re.match(pattern, text_lower):
-            return "greeting"
+    if first in _GREETING_FIRST_CHARS:
+        for pattern in _GREETING_RES:
+            if pattern.match(text_lower):
+                return "greeting"
     
     if text_stripped in GREETING_WORDS:
         return "greeting"
     
     # Priority 5: Check for farewell
-    if is_farewell(text_lower):
+    if _is_farewell(text_lower):
         return "farewell"
     
     # Priority 6: Help patterns
-    if re.search(r'^help$|^what can you|^how do i|^how to', text_lower):
+    if first in _HELP_FIRST_CHARS and _HELP_RE.search(text_lower):
         return "help"
     
     # Priority 7: View plan patterns
-    if re.search(r'(show|display|view|see|print)\s+(the\s+)?(plan|account plan|report)', text_lower):
+    if _VIEW_PLAN_RE.search(text_lower):
         return "view_plan"
     
     # Priority 8: Update patterns
-    is_update, _, _ = is_update_request(text)
+    is_update, _, _ = _match_update(text_clean)
     if is_update:
         return "update"
     
     # Priority 9: Explicit research patterns
-    if re.search(r'^(research|look up|find|analyze|tell me about|information on|learn about)\s+', text_lower):
+    if first in _RESEARCH_FIRST_CHARS and _RESEARCH_RE.search(text_lower):
         return "research"
     
     # Priority 10: Off-topic detection
-    off_topic_signals = [
-    r'\bweather\b', r'\brain\b', r'\bsnow\b', r'\bsunny\b',
-
-    r'\bjoke\b', r'\bfun fact\b', r'\bmake me laugh\b',
-    r'\btell me something funny\b',
-
-    r'\bstory\b', r'\btell me a story\b',
-    r'\bmovie recommendation\b', r'\bsong recommendation\b',
-
-    r'\brecipe\b', r'\bhow to cook\b', r'\bwhat should i eat\b',
-
-    r'\bbook me a flight\b', r'\bbook a ticket\b', r'\bflight status\b',
-    r'\bhotel\b', r'\bwhere is\b', r'\bdirections to\b',
-
-    r'\bsports score\b', r'\bcricket score\b', r'\bwho won the match\b',
-
-    r'\bhow are you\b', r'\bwho are you\b', r'\bwhat are you\b',
-    r'\byour name\b', r'\bwhere are you from\b',
-
-    r'\bfix my phone\b', r'\bcalculator\b', r'\bunit conversion\b',
-
-    r'\bsolve this math\b', r'\bcalculate\b',
-    r'\bintegral of\b', r'\bdifferentiation\b',
-
-    r'\brelationship advice\b', r'\blove advice\b',
-    r'\bgirlfriend\b', r'\bboyfriend\b', r'\bcrush\b',
-
-    r'\bmeaning of life\b', r'\bpurpose of life\b', r'\bexistence\b',
-
-    r'\bwho will win\b', r'\bhoroscope\b', r'\bzodiac\b'
-]
-
-    for signal in off_topic_signals:
-        if re.search(signal, text_lower):
-            return "off_topic"
+    if _OFF_TOPIC_RE.search(text_lower):
+        return "off_topic"
     
     # Priority 11: Could be a company name - let the normalizer decide
     # Only if it looks like it could be a company (not common words)
-    if len(text_clean) >= 2 and text_lower not in CONFIRMATION_WORDS | GREETING_WORDS | FAREWELL_WORDS | COMMAND_WORDS:
+    if len(text_clean) >= 2 and text_lower not in STOP_WORDS:
         return "potential_research"
     
     return "unclear"
 
 
+# Strong signals are explicit statements of confusion; weak ones are hedges
+_CONFUSION_STRONG_PATTERNS = (
+    r"i don'?t (know|understand|get)",
+    r"not sure",
+    r"help me understand"
+)
+_CONFUSION_WEAK_PATTERNS = (
+    r"what (do you mean|should i|is this|is that)",
+    r"confused",
+    r"\?\s*\?+",
+    r"huh\??",
+    r"um+",
+    r"uh+",
+    r"i guess"
+)
+_CONFUSION_PATTERNS = _CONFUSION_STRONG_PATTERNS + _CONFUSION_WEAK_PATTERNS
+
+_EFFICIENCY_PREFIX_PATTERNS = (r"just", r"only", r"quick")
+_EFFICIENCY_PATTERNS = (
+    r"^(" + "|".join(_EFFICIENCY_PREFIX_PATTERNS) + r")",
+    r"skip",
+    r"get to the point",
+    r"brief",
+    r"tl;?dr",
+    r"fast",
+    r"hurry"
+)
+
+_CONFUSION_RE = re.compile("|".join(_CONFUSION_PATTERNS))
+_CONFUSION_STRONG_RE = re.compile("|".join(_CONFUSION_STRONG_PATTERNS))
+_EFFICIENCY_RE = re.compile("|".join(_EFFICIENCY_PATTERNS))
+
+# Leading filler words; each may repeat its last letter ("ummm", "hmmm")
+_HESITATION_PREFIXES = ("um", "uh", "er", "ah", "hmm")
+
+# Confusion and efficiency checks in one match call: each optional lookahead
+# starts at position 0 and records whether its category occurs in the message.
+_SIGNAL_RE = re.compile(
+    r"(?:(?=.*?(?P<confusion>" + "|".join(_CONFUSION_PATTERNS) + r")))?"
+    r"(?:(?=(?P<efficiency>" + "|".join(_EFFICIENCY_PREFIX_PATTERNS)
+    + r"|.*?(?:" + "|".join(_EFFICIENCY_PATTERNS[1:]) + r"))))?",
+    re.DOTALL
+)
+
+
+@dataclass(frozen=True, slots=True)
+class SignalFlags:
+    """Persona signals found in a single user message."""
+    confusion: bool
+    efficiency: bool
+    hesitation: bool
+
+
+def detect_user_signals(text: str) -> SignalFlags:
+    """Detect confusion, efficiency and hesitation signals in one pass."""
+    text_lower = text.lower()
+    match = _SIGNAL_RE.match(text_lower)
+    return SignalFlags(
+        confusion=match.group("confusion") is not None,
+        efficiency=match.group("efficiency") is not None,
+        hesitation=text_lower.startswith(_HESITATION_PREFIXES)
+    )
+
+
+def strip_filler_prefix(text_lower: str) -> str:
+    """Drop one leading filler word ("umm, ...") from lowercased text and trim it."""
+    if text_lower.startswith(_HESITATION_PREFIXES):
+        for prefix in _HESITATION_PREFIXES:
+            if text_lower.startswith(prefix):
+                rest = text_lower[len(prefix):].lstrip(prefix[-1])
+                return rest.lstrip(", \t\n\r\f\v").strip()
+    return text_lower.strip()
+
+
+@lru_cache(maxsize=1024)
 def detect_confusion_signals(text: str) -> bool:
     """Detect if user seems confused."""
-    confusion_patterns = [
-        r"i don'?t (know|understand|get)",
-        r"what (do you mean|should i|is this|is that)",
-        r"confused",
-        r"not sure",
-        r"help me understand",
-        r"\?\s*\?+",
-        r"huh\??",
-        r"um+",
-        r"uh+",
-        r"i guess"
-    ]
-    
-    text_lower = text.lower()
-    return any(re.search(p, text_lower) for p in confusion_patterns)
+    return _CONFUSION_RE.search(text.lower()) is not None
 
 
 def detect_efficiency_signals(text: str) -> bool:
     """Detect if user prefers efficiency."""
-    efficiency_patterns = [
-        r"^(just|only|quick)",
-        r"skip",
-        r"get to the point",
-        r"brief",
-        r"tl;?dr",
-        r"fast",
-        r"hurry"
-    ]
-    
     text_lower = text.lower()
-    return any(re.search(p, text_lower) for p in efficiency_patterns)
+    return _EFFICIENCY_RE.search(text_lower) is not None
 
 
-import textwrap
+@lru_cache(maxsize=8)
+def _text_wrapper(width: int) -> textwrap.TextWrapper:
+    """Shared TextWrapper per width, so plans don't rebuild one per section."""
+    return textwrap.TextWrapper(width=width)
+
+
+@lru_cache(maxsize=16)
+def _box_borders(inner_width: int) -> Tuple[str, str]:
+    """Top and bottom box borders for a given inner width."""
+    line = "─" * inner_width
+    return f"┌{line}┐", f"└{line}┘"
+
 
 def format_account_plan(plan: dict, box_padding: int = 2, wrap_width: int = 76) -> str:
     """
@@ -325,45 +494,50 @@ def format_account_plan(plan: dict, box_padding: int = 2, wrap_width: int = 76)
         ("RISKS", plan.get("risks"))
     ]
 
-    # Prepare content lines
-    content_lines = []
-    content_lines.append("ACCOUNT PLAN")
-    content_lines.append(f"Generated: {plan.get('generated_at', 'N/A')}")
+    wrapper = _text_wrapper(wrap_width)
+
+    # Prepare content lines, tracking the widest one as we go
+    content_lines = ["ACCOUNT PLAN", f"Generated: {plan.get('generated_at', 'N/A')}"]
     
     if plan.get("last_updated"):
         content_lines.append(f"Last Updated: {plan['last_updated']}")
     content_lines.append("")  # blank line
+    longest_line = max(map(len, content_lines))
 
     for title, content in sections:
-        content_lines.append(f" {title} ")
+        header = f" {title} "
+        content_lines.append(header)
+        longest_line = max(longest_line, len(header))
         if content:
-            wrapped = textwrap.fill(content, width=wrap_width)
-            content_lines.extend(wrapped.split("\n"))
+            # A whitespace-only section still gets one (blank) line, as fill() gave
+            for line in wrapper.wrap(content) or [""]:
+                content_lines.append(line)
+                if len(line) > longest_line:
+                    longest_line = len(line)
         else:
             content_lines.append("[Not provided]")
+            longest_line = max(longest_line, len("[Not provided]"))
         content_lines.append("")  # blank line after each section
 
-    # Calculate box width
-    longest_line = max(len(line) for line in content_lines)
-    box_width = longest_line + box_padding * 2 + 2  # 2 for borders
-
-    top = "┌" + "─" * (box_width - 2) + "┐"
-    bottom = "└" + "─" * (box_width - 2) + "┘"
-
-    # Build the box
-    final_output = [top]
-    for line in content_lines:
-        padded = line.ljust(longest_line)
-        final_output.append("│" + " " * box_padding + padded + " " * box_padding + "│")
-    final_output.append(bottom)
-
-    return "\n".join(final_output)
+    # Build the box in one join
+    top, bottom = _box_borders(longest_line + box_padding * 2)
+    pad = " " * box_padding
+    left, right = "│" + pad, pad + "│"
+    return "\n".join([
+        top,
+        *[f"{left}{line:<{longest_line}}{right}" for line in content_lines],
+        bottom
+    ])
 
 
 # ============================================
 # VALIDATION UTILITIES
 # ============================================
 
+_DIGITS_ONLY_RE = re.compile(r'^[\d\s]+$')
+_INVALID_NAME_CHARS_RE = re.compile(r'[<>{}[\]\\|`~]')
+
+
 def validate_company_name(name: str) -> Tuple[bool, str]:
     """
     Validate a company name.
@@ -380,29 +554,31 @@ def validate_company_name(name: str) -> Tuple[bool, str]:
     if len(name) > 100:
         return False, "Company name is too long."
     
-    if re.match(r'^[\d\s]+$', name):
+    if _DIGITS_ONLY_RE.match(name):
         return False, "Company name cannot be just numbers."
     
-    if re.search(r'[<>{}[\]\\|`~]', name):
+    if _INVALID_NAME_CHARS_RE.search(name):
         return False, "Company name contains invalid characters."
     
     # Check against non-company words
-    if name.lower() in CONFIRMATION_WORDS | GREETING_WORDS | FAREWELL_WORDS:
+    if name.lower() in NAME_STOP_WORDS:
         return False, f"'{name}' doesn't appear to be a company name."
     
     return True, name
 
 
+_VALID_SECTIONS = frozenset({
+    'company_overview',
+    'key_products_services',
+    'competitors',
+    'opportunities',
+    'risks'
+})
+
+
 def is_valid_section_name(section: str) -> bool:
     """Check if a section name is valid."""
-    valid_sections = [
-        'company_overview',
-        'key_products_services',
-        'competitors',
-        'opportunities',
-        'risks'
-    ]
-    return section.lower() in valid_sections
+    return section.lower() in _VALID_SECTIONS
 
 
 # ============================================
@@ -476,11 +652,11 @@ def format_data_conflicts(conflicts: List[Dict]) -> str:
     if not conflicts:
         return ""
     
-    output = ["I found some conflicting information:"]
-    for i, conflict in enumerate(conflicts, 1):
-        output.append(f"  {i}. {conflict.get('description', 'Unknown conflict')}")
-        if conflict.get('options'):
-            for opt in conflict['options']:
-                output.append(f"     - {opt}")
+    def lines():
+        yield "I found some conflicting information:"
+        for i, conflict in enumerate(conflicts, 1):
+            yield f"  {i}. {conflict.get('description', 'Unknown conflict')}"
+            for opt in conflict.get('options') or ():
+                yield f"     - {opt}"
     
-    return "\n".join(output)
\ No newline at end of file
+    return "\n".join(lines())
\ No newline at end of file